@@ -1,10 +1,40 @@
+import time
+_import_start = time.perf_counter()
+
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
-from fastapi.responses import JSONResponse, RedirectResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, RedirectResponse
 
 import helium.db
+from helium import metrics, startup, tracing
+from helium.crud.contact import AUTOCOMPLETE, autocomplete, contact_cache, create_coalescer, _autocomplete_estimate, _autocomplete_source
 from helium.routes.contact import router as contact_router
+from helium.routes.stats import router as stats_router
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    startup.record("engine_init", helium.db.init_engines())
+    with startup.timed("schema"):
+        created = await helium.db.create_tables()
+    startup.report["schema_created"] = created
+    startup.record("warmup", await helium.db.warmup_engines())
+    startup.log_report()
+    helium.db.start_reader_probes()
+    # Built in the background; autocomplete queries the database until it is ready
+    if AUTOCOMPLETE:
+        autocomplete.start(_autocomplete_source, _autocomplete_estimate)
+
+    yield
+
+    await autocomplete.stop()
+
+    # Let creates already waiting in a group-commit batch finish before the worker exits
+    await create_coalescer.close()
+    await helium.db.dispose_engines()
 
 app = FastAPI(
+    lifespan=lifespan,
     title="Helium Project API",
     description="API for the Helium Project",
     contact={
@@ -14,17 +44,51 @@ app = FastAPI(
         }
 )
 
-@app.on_event("startup")
-async def on_startup():
-   await helium.db.create_tables()
+app.add_middleware(metrics.MetricsMiddleware)
+app.add_middleware(tracing.TracingMiddleware)
+helium.db.on_engine_created(metrics.instrument_engine)
+helium.db.on_engine_created(tracing.instrument_engine)
+
+def _pool_metric(field: str):
+    return lambda: {(role,): stats[field] for role, stats in helium.db.pool_stats().items()}
+
+for field, documentation in (
+    ("size", "Connections the pool keeps open."),
+    ("checked_out", "Connections currently checked out of the pool."),
+    ("overflow", "Connections open above the pool size."),
+    ("wait_max", "Longest time a checkout has waited for a connection, in seconds."),
+):
+    metrics.REGISTRY.register(metrics.CallbackMetric(
+        f"helium_db_pool_{field}", documentation, ("engine",), _pool_metric(field)
+    ))
+metrics.REGISTRY.register(metrics.CallbackMetric(
+    "helium_db_pool_timeouts", "Checkouts that timed out waiting for a connection.", ("engine",),
+    _pool_metric("timeouts"), type="counter",
+))
+metrics.REGISTRY.register(metrics.CallbackMetric(
+    "helium_contact_cache_lookups", "Contact cache lookups, by result.", ("result",),
+    lambda: {("hit",): contact_cache.hits, ("miss",): contact_cache.misses}, type="counter",
+))
+metrics.REGISTRY.register(metrics.CallbackMetric(
+    "helium_contact_cache_evictions", "Contact cache entries evicted to stay within size.", (),
+    lambda: {(): contact_cache.evictions}, type="counter",
+))
 
 @app.get("/")
 async def read_root():
     return RedirectResponse("/health")
 
 
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def read_metrics():
+    return PlainTextResponse(metrics.REGISTRY.render(), media_type=metrics.CONTENT_TYPE)
+
+
 @app.get("/health")
 async def health():
     return {"message": "OK!"}
 
 app.include_router(contact_router, prefix="/contacts", tags=["contacts"])
+app.include_router(stats_router, prefix="/stats", tags=["stats"])
+
+startup.record("import", time.perf_counter() - _import_start)
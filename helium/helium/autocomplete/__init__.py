@@ -0,0 +1,272 @@
+import time
+import asyncio
+from array import array
+from bisect import bisect_left, insort
+from typing import AsyncIterator, Awaitable, Callable, List, Optional, Sequence, Tuple
+
+# Seconds before a build that failed, e.g. because the database was unreachable, is retried
+BUILD_RETRY = 5
+# Bytes of each normalized term kept in the index; longer prefixes are answered by the database
+TERM_BYTES = 24
+
+
+def normalize(value: str) -> str:
+    """
+    Case-insensitive form of a name, email or prefix.
+    """
+    term = value.strip().casefold()
+    # Share the string when it is already normalized, as most emails are
+    return value if term == value else term
+
+
+def term_key(value: str) -> bytes:
+    """
+    Normalized UTF-8 form of a name or email as stored in the index, cut to TERM_BYTES.
+    UTF-8 bytes sort in code point order, so the keys sort like the terms they came from.
+    """
+    return normalize(value).encode()[:TERM_BYTES]
+
+
+class PrefixIndex:
+    """
+    Sorted name and email terms of contacts mapped to contact ids, searched by binary search.
+
+    The bulk of the index is built once from terms streamed in sorted order and packed into
+    three flat buffers: the terms cut to TERM_BYTES and concatenated, their offsets, and
+    the contact id of each term - a few dozen bytes per term, with no Python object per contact.
+    Names and emails are not kept; callers look the returned ids up.
+
+    Contacts written after the build are added to a small sorted overlay instead, and their
+    terms in the packed buffers are ignored from then on. The next build folds them in.
+    """
+
+    def __init__(self):
+        self._terms = bytearray()
+        self._offsets = array("I", [0])
+        self._ids = array("q")
+        # Contacts whose packed terms are outdated, because they were updated or deleted since the build
+        self._stale = set()
+        # Sorted (key, id) pairs written since the build, and each overlay contact's keys
+        self._overlay = []
+        self._overlay_keys = {}
+
+    def __len__(self) -> int:
+        return len(self._ids) + len(self._overlay)
+
+    def nbytes(self) -> int:
+        """
+        Approximate memory held by the packed buffers; the overlay is not counted.
+        """
+        return len(self._terms) + self._offsets.itemsize * len(self._offsets) + self._ids.itemsize * len(self._ids)
+
+    def _key(self, position: int) -> bytes:
+        return bytes(self._terms[self._offsets[position]:self._offsets[position + 1]])
+
+    def append(self, contact_id: int, value: str) -> None:
+        """
+        Adds a term while building; terms are expected in sorted order.
+        One that sorts before the previous term, e.g. because the database lowercases a character
+        differently than normalize(), goes to the overlay so the packed terms stay sorted.
+        """
+        key = term_key(value)
+        if self._ids and key < self._key(len(self._ids) - 1):
+            self._add_overlay(contact_id, key)
+            return
+        self._terms += key
+        self._offsets.append(len(self._terms))
+        self._ids.append(contact_id)
+
+    def _add_overlay(self, contact_id: int, key: bytes) -> None:
+        insort(self._overlay, (key, contact_id))
+        self._overlay_keys.setdefault(contact_id, []).append(key)
+
+    def set(self, contact_id: int, name: str, email: str) -> None:
+        self.remove(contact_id)
+        for key in {term_key(value) for value in (name, email) if value}:
+            self._add_overlay(contact_id, key)
+
+    def remove(self, contact_id: int) -> None:
+        self._stale.add(contact_id)
+        for key in self._overlay_keys.pop(contact_id, ()):
+            index = bisect_left(self._overlay, (key, contact_id))
+            if index < len(self._overlay) and self._overlay[index] == (key, contact_id):
+                del self._overlay[index]
+
+    def complete(self, prefix: str, limit: int) -> Optional[List[int]]:
+        """
+        Returns the ids of up to limit contacts whose name or email starts with prefix, in term order.
+        Returns None for a prefix longer than the stored terms, which the index cannot answer.
+        """
+        prefix = normalize(prefix).encode()
+        if len(prefix) > TERM_BYTES:
+            return None
+
+        matches = []
+        # Binary search over the packed terms
+        low, high = 0, len(self._ids)
+        while low < high:
+            middle = (low + high) // 2
+            if self._key(middle) < prefix:
+                low = middle + 1
+            else:
+                high = middle
+        seen = set()
+        while len(seen) < limit and low < len(self._ids):
+            key = self._key(low)
+            if not key.startswith(prefix):
+                break
+            contact_id = self._ids[low]
+            if contact_id not in self._stale and contact_id not in seen:
+                seen.add(contact_id)
+                matches.append((key, contact_id))
+            low += 1
+
+        seen = set()
+        index = bisect_left(self._overlay, (prefix,))
+        while len(seen) < limit and index < len(self._overlay) and self._overlay[index][0].startswith(prefix):
+            seen.add(self._overlay[index][1])
+            matches.append(self._overlay[index])
+            index += 1
+
+        # Both runs are in term order; merged, the first limit distinct contacts win
+        found = {}
+        for _, contact_id in sorted(matches):
+            if len(found) >= limit:
+                break
+            found.setdefault(contact_id, None)
+        return list(found)
+
+
+class Autocomplete:
+    """
+    Keeps a PrefixIndex of every contact in this worker, rebuilt in the background.
+
+    The index is built from a streaming read of every name and email term, sorted by the database,
+    at startup and again every refresh seconds, and kept current in between by set() and remove()
+    from the CRUD functions. Writes handled by other workers only show up after the next rebuild.
+    Until the first build finishes, or while the table holds more than max_entries terms,
+    complete() returns None and callers query the database instead.
+
+    A build is skipped without reading the table while the estimated number of terms is above
+    max_entries, so a table too large for the index costs one catalog lookup per refresh.
+    """
+
+    def __init__(self, max_entries: int, refresh: float):
+        self.max_entries = max_entries
+        self.refresh = refresh
+        self.index = None
+        self.builds = 0
+        self.last_build = None
+        self.last_build_seconds = None
+        self.last_error = None
+        # Writes seen while a rebuild streams the table, replayed onto the new index before it goes live
+        self._pending = None
+        self._task = None
+
+    def complete(self, prefix: str, limit: int) -> Optional[List[int]]:
+        if self.index is None:
+            return None
+        return self.index.complete(prefix, limit)
+
+    def set(self, contact_id: int, name: str, email: str) -> None:
+        if self._pending is not None:
+            self._pending.append((contact_id, name, email))
+        if self.index is None:
+            return
+        if len(self.index) >= self.max_entries:
+            # Dropping the index keeps memory bounded; reads go to the database until a rebuild fits
+            self.index = None
+            self.last_error = f"more than {self.max_entries} entries"
+            return
+        self.index.set(contact_id, name, email)
+
+    def remove(self, contact_id: int) -> None:
+        if self._pending is not None:
+            self._pending.append((contact_id, None, None))
+        if self.index is not None:
+            self.index.remove(contact_id)
+
+    async def rebuild(
+        self,
+        source: Callable[[], AsyncIterator[Sequence[Tuple[int, str]]]],
+        estimate: Optional[Callable[[], Awaitable[Optional[int]]]] = None,
+    ) -> None:
+        """
+        Builds a new index from the sorted (id, term) chunks of source and swaps it in.
+        Gives up, leaving no index, when estimate() or the build itself finds more than max_entries terms.
+        """
+        start = time.perf_counter()
+        if estimate is not None:
+            entries = await estimate()
+            if entries is not None and entries > self.max_entries:
+                self.index = None
+                self.last_error = f"about {entries} entries, more than {self.max_entries}"
+                return
+
+        self._pending = []
+        try:
+            index = PrefixIndex()
+            async for chunk in source():
+                for contact_id, term in chunk:
+                    index.append(contact_id, term)
+                if len(index) > self.max_entries:
+                    self.index = None
+                    self.last_error = f"more than {self.max_entries} entries"
+                    return
+
+            # No await from here on, so no write can slip in between the replay and the swap
+            for contact_id, name, email in self._pending:
+                if name is None:
+                    index.remove(contact_id)
+                else:
+                    index.set(contact_id, name, email)
+            self.index = index
+            self.last_error = None
+        finally:
+            self._pending = None
+            self.builds += 1
+            self.last_build = time.time()
+            self.last_build_seconds = time.perf_counter() - start
+
+    async def _rebuild_forever(self, source, estimate) -> None:
+        while True:
+            try:
+                await self.rebuild(source, estimate)
+            except Exception as e:
+                self.last_error = f"{type(e).__name__}: {e}"
+                print(f"ERROR - Autocomplete index build failed: {self.last_error}")
+                await asyncio.sleep(BUILD_RETRY)
+                continue
+
+            if self.refresh <= 0:
+                return
+            await asyncio.sleep(self.refresh)
+
+    def start(
+        self,
+        source: Callable[[], AsyncIterator[Sequence[Tuple[int, str]]]],
+        estimate: Optional[Callable[[], Awaitable[Optional[int]]]] = None,
+    ) -> None:
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._rebuild_forever(source, estimate))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "ready": self.index is not None,
+            "entries": len(self.index) if self.index is not None else 0,
+            "bytes": self.index.nbytes() if self.index is not None else 0,
+            "max_entries": self.max_entries,
+            "builds": self.builds,
+            "last_build": self.last_build,
+            "last_build_seconds": self.last_build_seconds,
+            "last_error": self.last_error,
+        }
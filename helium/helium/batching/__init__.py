@@ -0,0 +1,106 @@
+import asyncio
+from typing import Any, Awaitable, Callable, List, Sequence
+
+# Upper bounds of the batch size histogram buckets; the last bucket catches everything larger
+BATCH_SIZE_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+
+class BatchCoalescer:
+    """
+    Gathers items submitted within a short window (or up to max_batch items) into one batch.
+
+    flush receives the batch and returns one result per item, in order; a result that is
+    an exception is raised to that item's caller instead of returned. Each caller awaits
+    only its own item, so one failing item does not fail the rest of the batch.
+    """
+
+    def __init__(
+        self,
+        flush: Callable[[List[Any]], Awaitable[Sequence[Any]]],
+        window: float,
+        max_batch: int,
+    ):
+        self.flush = flush
+        self.window = window
+        self.max_batch = max(1, max_batch)
+        self.batches = 0
+        self.items = 0
+        self.histogram = [0] * (len(BATCH_SIZE_BUCKETS) + 1)
+        self._pending = []
+        self._timer = None
+        self._tasks = set()
+
+    async def submit(self, item: Any) -> Any:
+        """
+        Adds item to the current batch and waits for its result.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+
+        if len(self._pending) >= self.max_batch:
+            self._flush_pending()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush_pending)
+
+        return await future
+
+    def _flush_pending(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+
+        batch, self._pending = self._pending, []
+        task = asyncio.ensure_future(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: list) -> None:
+        self._record(len(batch))
+        try:
+            results = await self.flush([item for item, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            # The caller may have gone away while the batch was in flight
+            if future.done():
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def _record(self, size: int) -> None:
+        self.batches += 1
+        self.items += size
+        for index, bound in enumerate(BATCH_SIZE_BUCKETS):
+            if size <= bound:
+                self.histogram[index] += 1
+                return
+        self.histogram[-1] += 1
+
+    async def close(self) -> None:
+        """
+        Flushes whatever is pending and waits for every in-flight batch to finish.
+        """
+        self._flush_pending()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def stats(self) -> dict:
+        labels = [str(bound) for bound in BATCH_SIZE_BUCKETS] + ["+Inf"]
+        return {
+            "window": self.window,
+            "max_batch": self.max_batch,
+            "pending": len(self._pending),
+            "batches": self.batches,
+            "items": self.items,
+            "mean_batch_size": self.items / self.batches if self.batches else 0.0,
+            "batch_size_histogram": dict(zip(labels, self.histogram)),
+        }
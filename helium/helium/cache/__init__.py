@@ -0,0 +1,136 @@
+import time
+import asyncio
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable, Optional
+
+
+class LRUCache:
+    """
+    Bounded in-process cache with least-recently-used eviction and a per-entry TTL.
+
+    The cache is only touched from the event loop, so no locking is needed.
+    Each worker process holds its own copy; the TTL bounds how long a worker
+    can serve an entry that another worker has changed.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        # Bumped on every invalidation; a load notes it before reading, so set() can tell
+        # whether the key it loaded was invalidated while the load was in flight
+        self.generation = 0
+        # Generation each recently invalidated key was last invalidated at, oldest first, at most maxsize keys
+        self._invalidated = OrderedDict()
+        # Newest generation dropped from _invalidated; loads older than it cannot be checked per key
+        self._forgotten = 0
+        self._entries = OrderedDict()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Returns the cached value for key, or default when it is missing or expired.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+
+        value, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return default
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, generation: Optional[int] = None) -> None:
+        """
+        Stores value under key, evicting the least recently used entry when full.
+        When generation is given, the value is dropped if key was invalidated since it was read.
+        """
+        if self.maxsize <= 0:
+            return
+        if generation is not None and (generation < self._forgotten or self._invalidated.get(key, 0) > generation):
+            return
+
+        self._entries[key] = (value, time.monotonic() + self.ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        """
+        Removes key from the cache, and keeps loads of it already in flight from storing their value.
+        """
+        self.generation += 1
+        self._entries.pop(key, None)
+        self._invalidated[key] = self.generation
+        self._invalidated.move_to_end(key)
+        while len(self._invalidated) > self.maxsize:
+            _, self._forgotten = self._invalidated.popitem(last=False)
+
+    def clear(self) -> None:
+        """
+        Removes every entry from the cache, and keeps every load in flight from storing its value.
+        """
+        self.generation += 1
+        self._entries.clear()
+        self._invalidated.clear()
+        self._forgotten = self.generation
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical calls in one worker into a single in-flight call.
+
+    The first caller for a key starts the call; callers arriving while it is still
+    running wait on the same result instead of issuing their own query. The call
+    is shielded, so a waiter going away does not cancel it for the others.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.shared = 0
+        self._inflight = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Returns the result of fn(), sharing it with every concurrent caller using the same key.
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+            self.calls += 1
+        else:
+            self.shared += 1
+
+        return await asyncio.shield(task)
+
+    def stats(self) -> dict:
+        return {
+            "inflight": len(self._inflight),
+            "calls": self.calls,
+            "shared": self.shared,
+        }
@@ -1,67 +1,675 @@
+import os
+import json
+import base64
+import binascii
 from sqlalchemy.orm import Session
 from sqlalchemy.future import select
-from sqlalchemy import update, delete
-from typing import List, Optional
+from sqlalchemy import text, union_all, update, delete, tuple_, values, column, any_, bindparam, func, literal, or_, Column, Integer, MetaData, String, Table
+from sqlalchemy.dialects.postgresql import insert, ARRAY
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession
+from sqlalchemy.schema import CreateTable
+from typing import AsyncIterator, Dict, List, Optional, Sequence, Tuple
 from fastapi import HTTPException
 
+from helium.autocomplete import TERM_BYTES, Autocomplete, normalize
+from helium.batching import BatchCoalescer
+from helium.cache import LRUCache, SingleFlight
+import helium.db
+from helium.metrics import track_operation
+from helium.tracing import traced
+
 # Assuming imports from your schemas and models files
-from helium.models.contact import Contact
-from helium.schemas.contact import ContactCreate
+from helium.models.contact import Contact, email_domain as email_domain_of, email_lower, name_lower
+from helium.schemas.contact import READ_MANY_MAX, ContactCreate, ContactBulkUpdate
+
+# Read-through cache in front of _find_contact_by_id; a size of 0 disables it
+CACHE_SIZE = int(os.getenv("HELIUM_CACHE_SIZE", 10000))
+CACHE_TTL = float(os.getenv("HELIUM_CACHE_TTL", 30))
+
+contact_cache = LRUCache(maxsize=CACHE_SIZE, ttl=CACHE_TTL)
+# Concurrent identical reads in this worker share one database call
+read_flight = SingleFlight()
+
+# In-process prefix index behind /contacts/autocomplete, rebuilt every AUTOCOMPLETE_REFRESH seconds (0: only at startup)
+AUTOCOMPLETE = os.getenv("HELIUM_AUTOCOMPLETE", "true").lower() in ("1", "true", "yes")
+# Each worker holds its own index of two entries (name and email) per contact, at roughly 30 bytes per entry;
+# the default keeps it near 15 MB, inside the deployment's 128Mi per pod. Larger tables are served by the database
+AUTOCOMPLETE_MAX_ENTRIES = int(os.getenv("HELIUM_AUTOCOMPLETE_MAX_ENTRIES", 500000))
+AUTOCOMPLETE_REFRESH = float(os.getenv("HELIUM_AUTOCOMPLETE_REFRESH", 300))
+
+autocomplete = Autocomplete(max_entries=AUTOCOMPLETE_MAX_ENTRIES, refresh=AUTOCOMPLETE_REFRESH)
 
 # --- CREATE ---
-async def _create_contact(db: Session, contact: ContactCreate) -> Contact:
+@traced
+@track_operation
+async def _create_contact(db: Session, contact: ContactCreate) -> dict:
     """
     Creates a new contact with name and email.
+    Uniqueness of name and email is enforced by the database, so this is one INSERT ... RETURNING and a commit.
     """
-    existing_contact = await db.execute(
-        select(Contact).where(
-            (Contact.name == contact.name) | (Contact.email == contact.email)
+    if not helium.db.unique_names:
+        # Until contacts.name has its unique index only emails are caught by the database
+        taken = await db.scalar(select(Contact.id).where(Contact.name == contact.name).limit(1))
+        if taken is not None:
+            raise HTTPException(status_code=400, detail="Contact with this name or email already exists.")
+
+    try:
+        result = await db.execute(
+            insert(Contact)
+            .values(name=contact.name, email=contact.email)
+            .returning(Contact.id, Contact.name, Contact.email)
         )
-    )
-    if existing_contact.scalars().first():
+        new_contact = result.one()._asdict()
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
         raise HTTPException(status_code=400, detail="Contact with this name or email already exists.")
-    
-    new_contact = Contact(name=contact.name, email=contact.email)
-    db.add(new_contact)
-    await db.commit()
-    await db.refresh(new_contact)
-    
+
+    autocomplete.set(new_contact["id"], new_contact["name"], new_contact["email"])
     return new_contact
 
+BULK_BATCH_SIZE = int(os.getenv("HELIUM_BULK_BATCH_SIZE", 1000))
+# Two bind parameters per row; keeps a batch well under PostgreSQL's 32767 parameter limit
+BULK_BATCH_MAX = 10000
+
+@traced
+@track_operation
+async def _insert_contact_batch(db: Session, contacts: Sequence[ContactCreate]) -> List[Optional[int]]:
+    """
+    Inserts a batch of contacts with one multi-row INSERT ... ON CONFLICT DO NOTHING RETURNING,
+    in a single transaction. Returns the new id for each created contact, or None for duplicates.
+    """
+    # Within the batch the first occurrence of a name or email wins
+    pending = {}
+    seen_names, seen_emails = set(), set()
+    for index, contact in enumerate(contacts):
+        if contact.name in seen_names or contact.email in seen_emails:
+            continue
+        seen_names.add(contact.name)
+        seen_emails.add(contact.email)
+        pending[index] = contact
+
+    if pending and not helium.db.unique_names:
+        # Until contacts.name has its unique index, ON CONFLICT below only skips existing emails
+        taken = set((await db.execute(select(Contact.name).where(Contact.name.in_(seen_names)))).scalars())
+        pending = {index: contact for index, contact in pending.items() if contact.name not in taken}
+
+    ids = {}
+    if pending:
+        # The unique constraints on name and email turn existing contacts into skipped rows
+        result = await db.execute(
+            insert(Contact)
+            .values([{"name": contact.name, "email": contact.email} for contact in pending.values()])
+            .on_conflict_do_nothing()
+            .returning(Contact.id, Contact.email)
+        )
+        ids = {email: contact_id for contact_id, email in result}
+    await db.commit()
+    for contact in pending.values():
+        if contact.email in ids:
+            autocomplete.set(ids[contact.email], contact.name, contact.email)
+
+    return [
+        ids.get(contact.email) if index in pending else None
+        for index, contact in enumerate(contacts)
+    ]
+
+@traced
+@track_operation
+async def _bulk_create_contacts(
+    db: Session, contacts: Sequence[ContactCreate], batch_size: int = BULK_BATCH_SIZE
+) -> List[Optional[int]]:
+    """
+    Creates contacts in batches of batch_size, one transaction per batch.
+    Returns the new id for each created contact, or None for duplicates, in request order.
+    """
+    batch_size = max(1, min(batch_size, BULK_BATCH_MAX))
+    ids = []
+    for start in range(0, len(contacts), batch_size):
+        ids.extend(await _insert_contact_batch(db, contacts[start:start + batch_size]))
+
+    return ids
+
+# Per-transaction staging table for COPY imports, dropped again on commit or rollback
+staging_metadata = MetaData()
+contact_staging = Table(
+    "contacts_import",
+    staging_metadata,
+    Column("line", Integer),
+    Column("name", String),
+    Column("email", String),
+    prefixes=["TEMPORARY"],
+    postgresql_on_commit="DROP",
+)
+
+@traced
+@track_operation
+async def _copy_contact_batch(conn: AsyncConnection, rows: Sequence[Tuple[int, ContactCreate]]) -> Dict[int, int]:
+    """
+    Loads a batch of (line, contact) rows into a staging table with COPY and merges it into contacts
+    with one INSERT ... SELECT ... ON CONFLICT DO NOTHING RETURNING, in a single transaction.
+    Returns the new id of each created contact by line; every other line was a duplicate.
+    """
+    # Creating the staging table begins the transaction the COPY below runs in
+    await conn.execute(CreateTable(contact_staging))
+    driver = (await conn.get_raw_connection()).driver_connection
+    await driver.copy_records_to_table(
+        contact_staging.name,
+        records=[(line, contact.name, contact.email) for line, contact in rows],
+        columns=contact_staging.c.keys(),
+    )
+
+    # Within the batch the first occurrence of an email wins, so every returned email maps back to one line;
+    # duplicate names are skipped by the unique constraint like existing contacts
+    staged = contact_staging.c
+    first_by_email = (
+        select(staged.line, staged.name, staged.email)
+        .distinct(staged.email)
+        .order_by(staged.email, staged.line)
+        .subquery()
+    )
+    merged = select(first_by_email.c.name, first_by_email.c.email).order_by(first_by_email.c.line)
+    if not helium.db.unique_names:
+        # Until contacts.name has its unique index, skip names already taken or used earlier in the batch
+        first_by_name = select(staged.line).distinct(staged.name).order_by(staged.name, staged.line)
+        merged = merged.where(
+            first_by_email.c.line.in_(first_by_name),
+            ~select(Contact.id).where(Contact.name == first_by_email.c.name).exists(),
+        )
+    result = await conn.execute(
+        insert(Contact)
+        .from_select(["name", "email"], merged)
+        .on_conflict_do_nothing()
+        .returning(Contact.id, Contact.email)
+    )
+    ids = {email: contact_id for contact_id, email in result}
+    await conn.commit()
+
+    first_lines = {}
+    for line, contact in rows:
+        first_lines.setdefault(contact.email, line)
+    created = {line: ids[email] for email, line in first_lines.items() if email in ids}
+    for line, contact in rows:
+        if line in created:
+            autocomplete.set(created[line], contact.name, contact.email)
+
+    return created
+
+# Opt-in group commit for POST /contacts/create - creates arriving within the window share one INSERT and one COMMIT
+CREATE_COALESCE = os.getenv("HELIUM_CREATE_COALESCE", "false").lower() in ("1", "true", "yes")
+CREATE_COALESCE_WINDOW_MS = float(os.getenv("HELIUM_CREATE_COALESCE_WINDOW_MS", 2))
+CREATE_COALESCE_MAX_BATCH = int(os.getenv("HELIUM_CREATE_COALESCE_MAX_BATCH", 100))
+
+@traced
+@track_operation
+async def _create_contacts_grouped(items: List[Tuple[ContactCreate, bool]]) -> List[object]:
+    """
+    Flushes one group-commit batch of (contact, wants_token) creates on its own write session.
+    Returns (created contact, consistency token) for each item, or the 400 error for duplicates.
+    The token is fetched once for the whole batch, and only when an item asked for one.
+    """
+    contacts = [contact for contact, _ in items]
+    async with AsyncSession(helium.db.write_conn) as db:
+        ids = await _insert_contact_batch(db, contacts)
+    token = await helium.db.consistency_token() if any(wants_token for _, wants_token in items) else None
+
+    return [
+        ({"id": contact_id, "name": contact.name, "email": contact.email}, token if wants_token else None)
+        if contact_id is not None
+        else HTTPException(status_code=400, detail="Contact with this name or email already exists.")
+        for (contact, wants_token), contact_id in zip(items, ids)
+    ]
+
+create_coalescer = BatchCoalescer(
+    _create_contacts_grouped,
+    window=CREATE_COALESCE_WINDOW_MS / 1000,
+    max_batch=CREATE_COALESCE_MAX_BATCH,
+)
+
 # --- READ ---
-async def _list_contacts(db: Session) -> List[Contact]:
+LIST_LIMIT_DEFAULT = 100
+LIST_LIMIT_MAX = 1000
+
+# Sort orders of /contacts/list; a leading "-" sorts descending. Each is a walk over an index:
+# name -> ix_contacts_name (unique), email -> ix_contacts_email (unique), id -> the primary key
+LIST_SORTS = {
+    "name": (Contact.name, Contact.id),
+    "email": (Contact.email, Contact.id),
+    "id": (Contact.id,),
+    # ix_contacts_name_lower_id: names ignoring case, in byte-wise order
+    "name_lower": (name_lower(Contact.name), Contact.id),
+}
+# Sort orders each filter can be served in without a sequential scan or a sort of the whole table
+LIST_FILTER_SORTS = {
+    # ix_contacts_email_lower_id; at most a handful of contacts share an email, so any order is cheap
+    "email": ("name", "email", "id"),
+    # ix_contacts_email_domain_name_id, walked in (name, id) order within the domain
+    "email_domain": ("name",),
+    # A range of ix_contacts_name_lower_id, walked in its own order
+    "name_prefix": ("name_lower",),
+    # The primary key
+    "id_min": ("id",),
+    "id_max": ("id",),
+}
+
+def _encode_cursor(sort: str, values: Sequence) -> str:
     """
-    Retrieves all contacts.
+    Encodes the sort keys of the last row of a page into an opaque cursor.
     """
-    result = await db.execute(select(Contact).order_by(Contact.name))
-    return result.scalars().all()
+    raw = json.dumps([sort, *values], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
 
+def _decode_cursor(cursor: str, sort: str) -> list:
+    """
+    Decodes an opaque cursor back into the sort keys it was encoded from, for the given sort.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (binascii.Error, ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
 
-async def _find_contact_by_id(db: Session, contact_id: int) -> Optional[Contact]:
+    if not isinstance(values, list):
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
+    if not values or values[0] != sort:
+        raise HTTPException(status_code=400, detail="Cursor does not match the sort order.")
+
+    values = values[1:]
+    expected = [int] if len(LIST_SORTS[sort.lstrip("-")]) == 1 else [str, int]
+    # bool is an int subclass, so JSON true would otherwise pass as an id
+    if len(values) != len(expected) or not all(
+        isinstance(value, kind) and not isinstance(value, bool) for value, kind in zip(values, expected)
+    ):
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
+
+    return values
+
+def _prefix_bound(prefix: str) -> Optional[str]:
+    # Smallest string above every string starting with prefix, in byte-wise (C collation) order
+    if ord(prefix[-1]) >= 0x10FFFF:
+        return None
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+@traced
+@track_operation
+async def _list_contacts(
+    engine: AsyncEngine,
+    limit: int = LIST_LIMIT_DEFAULT,
+    cursor: Optional[str] = None,
+    sort: str = "name",
+    email: Optional[str] = None,
+    email_domain: Optional[str] = None,
+    name_prefix: Optional[str] = None,
+    id_min: Optional[int] = None,
+    id_max: Optional[int] = None,
+    fresh: bool = False,
+) -> Tuple[List[dict], Optional[str]]:
     """
-    Finds a single contact by its unique ID.
+    Retrieves a page of contacts matching the filters in the given sort order, starting after the cursor.
+    Returns the page as plain dicts and the cursor for the next page, or None on the last page.
+    Filter and sort combinations without a backing index (see LIST_FILTER_SORTS) are rejected with a 400.
+    Runs as a Core query on a pooled connection, with no session or ORM hydration.
+    With fresh=True the page is not shared with identical reads in flight, which may run on a lagging reader.
     """
-    result = await db.execute(select(Contact).where(Contact.id == contact_id))
-    return result.scalars().first()
+    limit = max(1, min(limit, LIST_LIMIT_MAX))
+    key = sort.lstrip("-")
+    descending = sort.startswith("-")
+    if key not in LIST_SORTS:
+        raise HTTPException(status_code=400, detail=f"Invalid sort {sort!r}.")
+
+    filters = {
+        "email": email,
+        "email_domain": email_domain,
+        "name_prefix": name_prefix,
+        "id_min": id_min,
+        "id_max": id_max,
+    }
+    filters = {name: value for name, value in filters.items() if value is not None and value != ""}
+    for name in filters:
+        if key not in LIST_FILTER_SORTS[name]:
+            allowed = " or ".join(f"sort={sort_key}" for sort_key in LIST_FILTER_SORTS[name])
+            raise HTTPException(status_code=400, detail=f"Filter {name} can only be used with {allowed}.")
+
+    columns = LIST_SORTS[key]
+    # The sort keys are selected too, since they are not all plain columns, to build the next cursor from
+    sort_keys = [column.label(f"sort_{index}") for index, column in enumerate(columns)]
+    query = select(Contact.id, Contact.name, Contact.email, *sort_keys).order_by(
+        *(column.desc() if descending else column for column in columns)
+    )
+    if "email" in filters:
+        query = query.where(email_lower(Contact.email) == filters["email"].lower())
+    if "email_domain" in filters:
+        query = query.where(email_domain_of(Contact.email) == filters["email_domain"].lower().lstrip("@"))
+    if "name_prefix" in filters:
+        prefix = filters["name_prefix"].lower()
+        # Spelled as a range on ix_contacts_name_lower_id, which unlike LIKE works with bound parameters
+        query = query.where(name_lower(Contact.name) >= prefix)
+        upper = _prefix_bound(prefix)
+        if upper is not None:
+            query = query.where(name_lower(Contact.name) < upper)
+    if "id_min" in filters:
+        query = query.where(Contact.id >= filters["id_min"])
+    if "id_max" in filters:
+        query = query.where(Contact.id <= filters["id_max"])
+    if cursor:
+        position = tuple_(*columns) if len(columns) > 1 else columns[0]
+        after = _decode_cursor(cursor, sort)
+        after = tuple(after) if len(columns) > 1 else after[0]
+        query = query.where(position < after if descending else position > after)
+
+    async def load_page():
+        # Fetch one extra row to find out whether there is a next page
+        async with engine.connect() as conn:
+            result = await conn.execute(query.limit(limit + 1))
+        rows = result.all()
+        contacts = [{"id": id, "name": name, "email": email} for id, name, email, *_ in rows[:limit]]
+        if len(rows) > limit:
+            return contacts, _encode_cursor(sort, list(rows[limit - 1][3:]))
+
+        return contacts, None
+
+    if fresh:
+        return await load_page()
+    flight_key = ("list", limit, cursor, sort, tuple(sorted(filters.items())))
+    return await read_flight.do(flight_key, load_page)
+
+
+SEARCH_MIN_LENGTH = 3
+SEARCH_LIMIT_DEFAULT = 20
+SEARCH_LIMIT_MAX = 100
+
+# Same escape character as SQLAlchemy's autoescape; it renders identically with or without standard_conforming_strings
+LIKE_ESCAPE = "/"
+
+def _escape_like(value: str) -> str:
+    return value.replace(LIKE_ESCAPE, LIKE_ESCAPE * 2).replace("%", LIKE_ESCAPE + "%").replace("_", LIKE_ESCAPE + "_")
+
+@traced
+@track_operation
+async def _search_contacts(engine: AsyncEngine, q: str, limit: int = SEARCH_LIMIT_DEFAULT, fresh: bool = False) -> List[dict]:
+    """
+    Finds contacts whose name or email contains q, or is similar to it, best matches first.
+    Both conditions are served by the trigram GIN indexes on name and email.
+    Substring matches rank above fuzzy ones; within each group, by trigram similarity.
+    With fresh=True the results are not shared with identical searches in flight, as in _list_contacts.
+    """
+    q = q.strip()
+    if len(q) < SEARCH_MIN_LENGTH:
+        raise HTTPException(status_code=400, detail=f"Search query must be at least {SEARCH_MIN_LENGTH} characters.")
+    limit = max(1, min(limit, SEARCH_LIMIT_MAX))
+
+    term = literal(q, String)
+    pattern = f"%{_escape_like(q)}%"
+    contains = or_(Contact.name.ilike(pattern, escape=LIKE_ESCAPE), Contact.email.ilike(pattern, escape=LIKE_ESCAPE))
+    score = func.greatest(func.similarity(Contact.name, term), func.similarity(Contact.email, term))
+    query = (
+        select(Contact.id, Contact.name, Contact.email, score.label("score"))
+        # % is pg_trgm's similarity operator, true above pg_trgm.similarity_threshold (0.3 by default)
+        .where(or_(contains, Contact.name.op("%")(term), Contact.email.op("%")(term)))
+        .order_by(contains.desc(), score.desc(), Contact.id)
+        .limit(limit)
+    )
+
+    async def load_results():
+        async with engine.connect() as conn:
+            result = await conn.execute(query)
+        return [
+            {"id": id, "name": name, "email": email, "score": float(score)}
+            for id, name, email, score in result
+        ]
+
+    if fresh:
+        return await load_results()
+    return await read_flight.do(("search", q, limit), load_results)
+
+
+EXPORT_CHUNK_SIZE = int(os.getenv("HELIUM_EXPORT_CHUNK_SIZE", 1000))
+
+@traced
+@track_operation
+async def _stream_contacts(conn: AsyncConnection, chunk_size: int = EXPORT_CHUNK_SIZE) -> AsyncIterator[Sequence[Tuple[int, str, str]]]:
+    """
+    Streams every contact as (id, name, email) rows in chunks of chunk_size.
+    Rows are fetched through a server-side cursor, so memory stays flat for any table size.
+    """
+    result = await conn.stream(
+        select(Contact.id, Contact.name, Contact.email)
+        .order_by(Contact.id)
+        .execution_options(yield_per=chunk_size)
+    )
+    async for chunk in result.partitions():
+        yield chunk
+
+@traced
+@track_operation
+async def _autocomplete_source() -> AsyncIterator[Sequence[Tuple[int, str]]]:
+    """
+    Streams the (id, term) pairs of the autocomplete index from a reader, one per name and email,
+    lowercased, cut to the index's term length and sorted bytewise, so the index is built without sorting in Python.
+    """
+    terms = union_all(
+        select(Contact.id, func.left(func.lower(Contact.name), TERM_BYTES).label("term")).where(Contact.name.isnot(None)),
+        select(Contact.id, func.left(func.lower(Contact.email), TERM_BYTES)).where(Contact.email.isnot(None)),
+    ).subquery()
+    query = (
+        select(terms.c.id, terms.c.term)
+        .order_by(terms.c.term.collate("C"))
+        .execution_options(yield_per=EXPORT_CHUNK_SIZE)
+    )
+    async with helium.db.use_read_engine(autocommit=False) as engine, engine.connect() as conn:
+        result = await conn.stream(query)
+        async for chunk in result.partitions():
+            yield chunk
+
+@traced
+@track_operation
+async def _autocomplete_estimate() -> Optional[int]:
+    """
+    Planner estimate of the autocomplete index entries (two per contact), from the table statistics.
+    Returns None while the table has never been analyzed.
+    """
+    async with helium.db.use_read_engine() as engine, engine.connect() as conn:
+        rows = await conn.scalar(text("SELECT reltuples FROM pg_class WHERE oid = 'contacts'::regclass"))
+    return int(rows) * 2 if rows is not None and rows >= 0 else None
+
+AUTOCOMPLETE_LIMIT_DEFAULT = 10
+AUTOCOMPLETE_LIMIT_MAX = 50
+
+@traced
+@track_operation
+async def _autocomplete_contacts(
+    engine: AsyncEngine, prefix: str, limit: int = AUTOCOMPLETE_LIMIT_DEFAULT, fresh: bool = False
+) -> List[dict]:
+    """
+    Finds up to limit contacts whose name or email starts with prefix, ignoring case.
+    Matching ids come from the in-process autocomplete index and are looked up like GET /contacts/read-many; the
+    database is searched only while the index is unavailable or for prefixes longer than the index keeps.
+    With fresh=True the database is always searched, since the index may not have seen writes made through other workers.
+    """
+    limit = max(1, min(limit, AUTOCOMPLETE_LIMIT_MAX))
+    # Lowercased like the database does, for the range scans below
+    lowered = prefix.strip().lower()
+    prefix = normalize(prefix)
+    ids = None if fresh else autocomplete.complete(prefix, limit)
+    if ids is not None:
+        # The index keeps ids only; contacts renamed or deleted by another worker since the last build are dropped
+        items, _ = await _find_contacts_by_ids(engine, ids)
+        return [
+            item for item in items
+            if any(normalize(value).startswith(prefix) for value in (item["name"], item["email"]) if value)
+        ]
+
+    # One range scan per column, over ix_contacts_name_lower_id and ix_contacts_email_lower_id, each stopping
+    # after limit rows in index order; the first limit distinct contacts of both, in term order, are the answer
+    upper = _prefix_bound(lowered) if lowered else None
+    scans = []
+    for term in (name_lower(Contact.name), email_lower(Contact.email)):
+        scan = select(Contact.id, Contact.name, Contact.email, term.label("term")).where(term >= lowered)
+        if upper is not None:
+            scan = scan.where(term < upper)
+        scans.append(scan.order_by(term, Contact.id).limit(limit))
+    query = union_all(*scans)
+
+    async def load_matches():
+        async with engine.connect() as conn:
+            result = await conn.execute(query)
+        # Python compares strings by code point, as the C collation does
+        found = {}
+        for id, name, email, _ in sorted(result, key=lambda row: (row[3], row[0])):
+            if len(found) >= limit:
+                break
+            found.setdefault(id, {"id": id, "name": name, "email": email})
+        return list(found.values())
+
+    if fresh:
+        return await load_matches()
+    return await read_flight.do(("autocomplete", prefix, limit), load_matches)
+
+
+@traced
+@track_operation
+async def _find_contact_by_id(engine: AsyncEngine, contact_id: int, fresh: bool = False) -> Optional[dict]:
+    """
+    Finds a single contact by its unique ID, serving it from contact_cache when possible.
+    A pooled connection is checked out only on a cache miss.
+    With fresh=True the cache and in-flight reads are skipped, since they may predate a write the caller has seen.
+    """
+    if not fresh:
+        cached = contact_cache.get(contact_id)
+        if cached is not None:
+            return cached
+
+    async def load_contact():
+        generation = contact_cache.generation
+        async with engine.connect() as conn:
+            result = await conn.execute(
+                select(Contact.id, Contact.name, Contact.email).where(Contact.id == contact_id)
+            )
+        contact = result.first()
+        if contact is None:
+            return None
+
+        found_contact = contact._asdict()
+        contact_cache.set(contact_id, found_contact, generation=generation)
+        return found_contact
+
+    if fresh:
+        return await load_contact()
+    return await read_flight.do(("read", contact_id), load_contact)
+
+@traced
+@track_operation
+async def _find_contacts_by_ids(
+    engine: AsyncEngine, contact_ids: Sequence[int], fresh: bool = False
+) -> Tuple[List[dict], List[int]]:
+    """
+    Finds contacts by their IDs, serving what it can from contact_cache and the rest
+    with a single SELECT ... WHERE id = ANY(:ids).
+    Returns the contacts found in request order, with duplicate ids collapsed, and the ids that do not exist.
+    With fresh=True the cache is skipped, as in _find_contact_by_id.
+    """
+    contact_ids = list(dict.fromkeys(contact_ids))
+    if len(contact_ids) > READ_MANY_MAX:
+        raise HTTPException(status_code=400, detail=f"At most {READ_MANY_MAX} ids can be read at once.")
+
+    found = {}
+    if not fresh:
+        for contact_id in contact_ids:
+            cached = contact_cache.get(contact_id)
+            if cached is not None:
+                found[contact_id] = cached
+
+    misses = [contact_id for contact_id in contact_ids if contact_id not in found]
+    if misses:
+        generation = contact_cache.generation
+        ids = bindparam("ids", misses, type_=ARRAY(Integer))
+        async with engine.connect() as conn:
+            result = await conn.execute(
+                select(Contact.id, Contact.name, Contact.email).where(Contact.id == any_(ids))
+            )
+        for contact in result:
+            found_contact = contact._asdict()
+            found[found_contact["id"]] = found_contact
+            contact_cache.set(found_contact["id"], found_contact, generation=generation)
+
+    items = [found[contact_id] for contact_id in contact_ids if contact_id in found]
+    missing = [contact_id for contact_id in contact_ids if contact_id not in found]
+    return items, missing
 
 # --- UPDATE ---
+@traced
+@track_operation
 async def _update_contact(db: Session, contact_id: int, contact_data: dict) -> int:
     """
     Updates an existing contact by its ID.
+    Conflicts with another contact's name or email are caught by the database's unique constraints.
     """
-    if "email" in contact_data:
-        existing_email = await db.execute(select(Contact).where(Contact.email == contact_data["email"]))
-        found_contact = existing_email.scalars().first()
-        if found_contact and found_contact.id != contact_id:
-            raise HTTPException(status_code=400, detail="Another contact with this email already exists.")
-    
-    query = update(Contact).where(Contact.id == contact_id).values(**contact_data)
-    result = await db.execute(query)
-    await db.commit()
-    
-    return result.rowcount
+    query = (
+        update(Contact)
+        .where(Contact.id == contact_id)
+        .values(**contact_data)
+        .returning(Contact.id, Contact.name, Contact.email)
+    )
+    try:
+        result = await db.execute(query)
+        updated = result.all()
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="Another contact with this name or email already exists.")
+
+    contact_cache.invalidate(contact_id)
+    for id, name, email in updated:
+        autocomplete.set(id, name, email)
+    return len(updated)
+
+@traced
+@track_operation
+async def _bulk_update_contacts(
+    db: Session, contacts: Sequence[ContactBulkUpdate], batch_size: int = BULK_BATCH_SIZE
+) -> int:
+    """
+    Updates contacts in batches with one UPDATE ... FROM (VALUES ...) per batch, one transaction per batch.
+    Returns the number of contacts updated.
+    """
+    batch_size = max(1, min(batch_size, BULK_BATCH_MAX))
+    # A row can only be updated once per statement, so the last payload for an id wins
+    latest = {contact.id: contact for contact in contacts}
+    contacts = list(latest.values())
+
+    updated_count = 0
+    for start in range(0, len(contacts), batch_size):
+        rows = values(
+            column("id", Integer), column("name", String), column("email", String), name="v"
+        ).data([(contact.id, contact.name, contact.email) for contact in contacts[start:start + batch_size]])
+        query = (
+            update(Contact)
+            .where(Contact.id == rows.c.id)
+            .values(name=rows.c.name, email=rows.c.email)
+            .returning(Contact.id, Contact.name, Contact.email)
+        )
+        try:
+            updated = (await db.execute(query)).all()
+            await db.commit()
+        except IntegrityError:
+            await db.rollback()
+            raise HTTPException(
+                status_code=400,
+                detail=f"Another contact with this name or email already exists. {updated_count} contacts were updated before the conflicting batch.",
+            )
+        updated_count += len(updated)
+        for contact in contacts[start:start + batch_size]:
+            contact_cache.invalidate(contact.id)
+        # Only ids that exist were updated, and only those belong in the autocomplete index
+        for id, name, email in updated:
+            autocomplete.set(id, name, email)
+
+    return updated_count
 
 # --- DELETE ---
+@traced
+@track_operation
 async def _delete_contact(db: Session, contact_id: int) -> int:
     """
     Deletes a contact by its ID.
@@ -69,5 +677,29 @@ async def _delete_contact(db: Session, contact_id: int) -> int:
     query = delete(Contact).where(Contact.id == contact_id)
     result = await db.execute(query)
     await db.commit()
+    contact_cache.invalidate(contact_id)
+    autocomplete.remove(contact_id)
     
     return result.rowcount
+
+@traced
+@track_operation
+async def _bulk_delete_contacts(db: Session, contact_ids: Sequence[int], batch_size: int = BULK_BATCH_SIZE) -> int:
+    """
+    Deletes contacts in batches with one DELETE ... WHERE id = ANY(:ids) per batch, one transaction per batch.
+    Returns the number of contacts deleted.
+    """
+    batch_size = max(1, min(batch_size, BULK_BATCH_MAX))
+    contact_ids = list(dict.fromkeys(contact_ids))
+
+    deleted_count = 0
+    for start in range(0, len(contact_ids), batch_size):
+        ids = bindparam("ids", contact_ids[start:start + batch_size], type_=ARRAY(Integer))
+        result = await db.execute(delete(Contact).where(Contact.id == any_(ids)))
+        await db.commit()
+        deleted_count += result.rowcount
+        for contact_id in ids.value:
+            contact_cache.invalidate(contact_id)
+            autocomplete.remove(contact_id)
+
+    return deleted_count
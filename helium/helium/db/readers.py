@@ -0,0 +1,250 @@
+import os
+import time
+import asyncio
+import itertools
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List, Optional
+
+from sqlalchemy import text # type: ignore
+from sqlalchemy.ext.asyncio import AsyncEngine # type: ignore
+
+from helium.cache import SingleFlight
+
+# least_outstanding | round_robin
+READ_STRATEGY = os.getenv("HELIUM_DB_READ_STRATEGY", "least_outstanding").lower()
+# Seconds between health and replica lag probes of every reader
+PROBE_INTERVAL = float(os.getenv("HELIUM_DB_READ_PROBE_INTERVAL", 5))
+PROBE_TIMEOUT = float(os.getenv("HELIUM_DB_READ_PROBE_TIMEOUT", 2))
+# Readers lagging more than this many seconds are taken out of rotation
+MAX_LAG = float(os.getenv("HELIUM_DB_READ_MAX_LAG", 10))
+# Replica lag in seconds, or NULL when it cannot be told, which takes the reader out of rotation.
+# Overrides the built-in queries below, which are picked per reader on its first probe
+LAG_QUERY = os.getenv("HELIUM_DB_READ_LAG_QUERY")
+# Streaming replication: 0 on a primary, and 0 on an idle replica that has replayed everything it received.
+# A replica not receiving WAL by streaming (e.g. restoring from an archive) has no measurable lag
+POSTGRES_LAG_QUERY = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() IS NULL THEN NULL
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+    END
+"""
+# Aurora replicas share the writer's storage instead of streaming WAL, so the queries above see no
+# receive position; Aurora reports each replica's lag in aurora_replica_status() instead
+AURORA_LAG_QUERY = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        ELSE (
+            SELECT replica_lag_in_msec / 1000.0 FROM aurora_replica_status()
+            WHERE server_id = aurora_db_instance_identifier()
+        )
+    END
+"""
+AURORA_CHECK_QUERY = "SELECT to_regproc('aurora_replica_status') IS NOT NULL"
+# Longest a read carrying a consistency token waits for a reader to catch up before going to the writer
+RYW_MAX_WAIT_MS = float(os.getenv("HELIUM_RYW_MAX_WAIT_MS", 50))
+RYW_POLL_MS = float(os.getenv("HELIUM_RYW_POLL_MS", 5))
+# A primary has trivially replayed everything; a replica that has not replayed anything yet reports NULL
+REPLAY_LSN_QUERY = "SELECT pg_is_in_recovery(), pg_last_wal_replay_lsn()::text"
+CAUGHT_UP = float("inf")
+
+
+def parse_lsn(lsn: str) -> int:
+    """
+    Converts a PostgreSQL LSN such as '16/B374D848' into a comparable integer.
+    Raises ValueError for anything else.
+    """
+    high, low = lsn.split("/")
+    if not (0 < len(high) <= 8 and 0 < len(low) <= 8):
+        raise ValueError(f"invalid LSN {lsn!r}")
+    return (int(high, 16) << 32) | int(low, 16)
+
+
+class Reader:
+    """
+    One read replica: its engine, the requests currently using it, and its last probe result.
+    """
+
+    def __init__(self, name: str, host: str, engine: AsyncEngine):
+        self.name = name
+        self.host = host
+        self.engine = engine
+        # Same pool; single-statement reads skip the BEGIN/ROLLBACK round trips
+        self.autocommit = engine.execution_options(isolation_level="AUTOCOMMIT")
+        self.outstanding = 0
+        self.healthy = True
+        self.lag = 0.0
+        self.last_error = None
+        self.last_probe = None
+        # Highest WAL position this reader is known to have replayed; it only moves forward
+        self.replay_lsn = 0
+        # LAG_QUERY, or the built-in query for this kind of server, picked on the first probe
+        self.lag_query = LAG_QUERY
+        # False while the reader cannot report how far it has replayed (e.g. Aurora, which does not
+        # stream WAL); reads carrying a consistency token then skip it instead of polling it
+        self.serves_tokens = True
+
+    def stats(self) -> dict:
+        return {
+            "host": self.host,
+            "healthy": self.healthy,
+            "outstanding": self.outstanding,
+            "lag": self.lag,
+            "lag_query": "custom" if LAG_QUERY else "aurora" if self.lag_query == AURORA_LAG_QUERY else "postgres",
+            "last_error": self.last_error,
+            "last_probe": self.last_probe,
+            "replay_lsn": self.replay_lsn,
+            "serves_tokens": self.serves_tokens,
+        }
+
+    def _record_replay(self, in_recovery: bool, lsn: Optional[str]) -> None:
+        if not in_recovery:
+            self.replay_lsn = CAUGHT_UP
+        elif lsn is not None:
+            self.replay_lsn = max(self.replay_lsn, parse_lsn(lsn))
+        self.serves_tokens = self.lag_query != AURORA_LAG_QUERY and (not in_recovery or lsn is not None)
+
+    async def refresh_replay_lsn(self) -> float:
+        async with self.autocommit.connect() as conn:
+            in_recovery, lsn = (await conn.execute(text(REPLAY_LSN_QUERY))).one()
+        self._record_replay(in_recovery, lsn)
+        return self.replay_lsn
+
+
+class ReaderSet:
+    """
+    Spreads reads over several replicas, by least outstanding requests or round robin.
+
+    A background task probes every reader; a reader that fails its probe or lags
+    more than MAX_LAG seconds is left out of rotation until a later probe passes.
+    When no reader is healthy, select() returns None and callers fall back to the writer.
+    """
+
+    def __init__(self, readers: List[Reader], strategy: str = READ_STRATEGY):
+        self.readers = readers
+        self.strategy = strategy
+        self.fallbacks = 0
+        # Reads carrying a consistency token: served without waiting, after waiting, or by the writer
+        self.token_reads = {"immediate": 0, "waited": 0, "writer": 0}
+        # Concurrent token reads waiting on the same reader share one replay position query
+        self._replay_flight = SingleFlight()
+        self._turn = itertools.count()
+        self._probe_task = None
+
+    def select(self) -> Optional[Reader]:
+        healthy = [reader for reader in self.readers if reader.healthy]
+        if not healthy:
+            self.fallbacks += 1
+            return None
+
+        start = next(self._turn) % len(healthy)
+        if self.strategy == "round_robin":
+            return healthy[start]
+        # Rotating the starting point spreads ties instead of always picking the first reader
+        rotated = healthy[start:] + healthy[:start]
+        return min(rotated, key=lambda reader: reader.outstanding)
+
+    async def _refresh_replay_lsn(self, reader: Reader, timeout: float) -> float:
+        return await asyncio.wait_for(
+            self._replay_flight.do(reader.name, reader.refresh_replay_lsn), timeout
+        )
+
+    async def select_caught_up(self, lsn: int, max_wait: float = RYW_MAX_WAIT_MS / 1000) -> Optional[Reader]:
+        """
+        Picks a healthy reader that has replayed the WAL up to lsn, polling for at most max_wait seconds.
+        Returns None when no reader catches up in time, or none can report its replay position,
+        and callers go to the writer instead.
+        """
+        deadline = time.perf_counter() + max_wait
+        waited = False
+        while True:
+            candidates = [reader for reader in self.readers if reader.healthy and reader.serves_tokens]
+            # A reader seen past lsn before needs no round trip
+            caught_up = [reader for reader in candidates if reader.replay_lsn >= lsn]
+            remaining = deadline - time.perf_counter()
+            if not caught_up and candidates and remaining > 0:
+                # Checking every reader at once finds the first one to catch up; a reader
+                # that hangs costs at most the remaining wait
+                replayed = await asyncio.gather(
+                    *(self._refresh_replay_lsn(reader, remaining) for reader in candidates), return_exceptions=True
+                )
+                caught_up = [
+                    reader for reader, replay_lsn in zip(candidates, replayed)
+                    if not isinstance(replay_lsn, BaseException) and replay_lsn >= lsn
+                ]
+            if caught_up:
+                self.token_reads["waited" if waited else "immediate"] += 1
+                return min(caught_up, key=lambda reader: reader.outstanding)
+
+            remaining = deadline - time.perf_counter()
+            if not any(reader.healthy and reader.serves_tokens for reader in candidates) or remaining <= 0:
+                self.token_reads["writer"] += 1
+                return None
+            await asyncio.sleep(min(RYW_POLL_MS / 1000, remaining))
+            waited = True
+
+    @asynccontextmanager
+    async def use(self, reader: Reader) -> AsyncIterator[Reader]:
+        reader.outstanding += 1
+        try:
+            yield reader
+        finally:
+            reader.outstanding -= 1
+
+    async def probe(self, reader: Reader) -> None:
+        """
+        Checks that reader answers within PROBE_TIMEOUT and lags at most MAX_LAG seconds.
+        A reader whose lag cannot be told is treated as lagging.
+        """
+        async def replica_lag():
+            async with reader.autocommit.connect() as conn:
+                if reader.lag_query is None:
+                    aurora = await conn.scalar(text(AURORA_CHECK_QUERY))
+                    reader.lag_query = AURORA_LAG_QUERY if aurora else POSTGRES_LAG_QUERY
+                lag = await conn.scalar(text(reader.lag_query))
+                if reader.lag_query == AURORA_LAG_QUERY:
+                    reader.serves_tokens = False
+                else:
+                    # Keeps the replay position fresh, and lets a reader that could not report one serve tokens again
+                    reader._record_replay(*(await conn.execute(text(REPLAY_LSN_QUERY))).one())
+                return lag
+
+        try:
+            lag = await asyncio.wait_for(replica_lag(), PROBE_TIMEOUT)
+            reader.lag = None if lag is None else float(lag)
+            reader.healthy = reader.lag is not None and reader.lag <= MAX_LAG
+            if reader.lag is None:
+                reader.last_error = "replica lag unknown"
+            else:
+                reader.last_error = None if reader.healthy else f"replica lag {reader.lag:.1f}s"
+        except Exception as e:
+            reader.healthy = False
+            reader.last_error = f"{type(e).__name__}: {e}"
+        reader.last_probe = time.time()
+
+    async def _probe_forever(self) -> None:
+        while True:
+            await asyncio.gather(*(self.probe(reader) for reader in self.readers))
+            await asyncio.sleep(PROBE_INTERVAL)
+
+    def start(self) -> None:
+        if self._probe_task is None:
+            self._probe_task = asyncio.ensure_future(self._probe_forever())
+
+    async def stop(self) -> None:
+        if self._probe_task is not None:
+            self._probe_task.cancel()
+            try:
+                await self._probe_task
+            except asyncio.CancelledError:
+                pass
+            self._probe_task = None
+
+    def stats(self) -> dict:
+        return {
+            "strategy": self.strategy,
+            "writer_fallbacks": self.fallbacks,
+            "consistency_token_reads": self.token_reads,
+            "readers": {reader.name: reader.stats() for reader in self.readers},
+        }
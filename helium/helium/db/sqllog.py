@@ -0,0 +1,83 @@
+import os
+import re
+import json
+import time
+import queue
+import atexit
+import random
+import hashlib
+import logging
+import logging.handlers
+from functools import lru_cache
+from typing import Tuple
+
+from sqlalchemy import event # type: ignore
+from sqlalchemy.ext.asyncio import AsyncEngine # type: ignore
+
+# Statements slower than this are always logged; the rest are logged at SAMPLE_RATE (0.0 - 1.0)
+SLOW_QUERY_MS = float(os.getenv("HELIUM_SQL_SLOW_MS", 200))
+SAMPLE_RATE = float(os.getenv("HELIUM_SQL_SAMPLE_RATE", 0))
+
+logger = logging.getLogger("helium.sql")
+
+_PLACEHOLDERS = re.compile(r"\$\d+(?:::\w+(?:\[\])?)?|%\(\w+\)s|'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+# Multi-row VALUES lists differ only in how many rows they carry
+_ROW_LISTS = re.compile(r"\(\?(?:, \?)*\)(?:, \(\?(?:, \?)*\))+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=1024)
+def fingerprint(statement: str) -> Tuple[str, str]:
+    """
+    Normalizes a statement so queries differing only in parameters or row counts look the same.
+    Returns a short hash of the normalized statement and the normalized statement itself.
+    """
+    normalized = _WHITESPACE.sub(" ", statement).strip()
+    normalized = _PLACEHOLDERS.sub("?", normalized)
+    normalized = _ROW_LISTS.sub("(?), ...", normalized)
+    return hashlib.sha1(normalized.encode()).hexdigest()[:12], normalized
+
+
+def _start_listener() -> None:
+    """
+    Routes helium.sql records through a queue, so the actual write happens off the event loop.
+    """
+    records = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(records, logging.StreamHandler())
+    logger.addHandler(logging.handlers.QueueHandler(records))
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    listener.start()
+    atexit.register(listener.stop)
+
+
+def install(engine: AsyncEngine, name: str) -> None:
+    """
+    Hooks slow-query and sampled statement logging into an engine.
+    """
+    if not logger.handlers:
+        _start_listener()
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        context._query_start = time.perf_counter()
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        duration_ms = (time.perf_counter() - context._query_start) * 1000
+        slow = duration_ms >= SLOW_QUERY_MS
+        if not slow and (SAMPLE_RATE <= 0 or random.random() >= SAMPLE_RATE):
+            return
+
+        query_id, normalized = fingerprint(statement)
+        logger.log(
+            logging.WARNING if slow else logging.INFO,
+            json.dumps({
+                "event": "slow_query" if slow else "sampled_query",
+                "engine": name,
+                "fingerprint": query_id,
+                "statement": normalized,
+                "duration_ms": round(duration_ms, 3),
+                "rows": cursor.rowcount,
+            }),
+        )
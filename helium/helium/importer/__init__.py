@@ -0,0 +1,273 @@
+import os
+import csv
+import json
+import codecs
+from collections import deque
+from typing import Any, AsyncIterator, List, Tuple
+
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+
+import helium.db
+from helium.crud.contact import _copy_contact_batch
+from helium.schemas.contact import ContactCreate
+
+# Rows validated, copied and merged per transaction; memory use is bounded by one chunk
+IMPORT_CHUNK_SIZE = int(os.getenv("HELIUM_IMPORT_CHUNK_SIZE", 5000))
+IMPORT_CHUNK_MAX = 100000
+# Longest line, and longest CSV record including quoted line breaks, kept in memory while parsing
+IMPORT_MAX_RECORD = int(os.getenv("HELIUM_IMPORT_MAX_RECORD", 65536))
+
+
+class ImportFileError(ValueError):
+    """
+    The file as a whole cannot be imported, e.g. a CSV file without name and email columns.
+    """
+
+
+async def _lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[List[str]]:
+    """
+    Decodes a stream of UTF-8 byte chunks into lists of complete lines, without line endings.
+    A leading byte order mark is dropped. A line longer than IMPORT_MAX_RECORD characters stops the import.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    partial = ""
+    async for chunk in chunks:
+        lines = (partial + decoder.decode(chunk)).split("\n")
+        partial = lines.pop()
+        if len(partial) > IMPORT_MAX_RECORD:
+            raise ImportFileError(f"A line is longer than {IMPORT_MAX_RECORD} characters.")
+        if lines:
+            yield [line.rstrip("\r") for line in lines]
+
+    partial += decoder.decode(b"", final=True)
+    if partial:
+        yield [partial.rstrip("\r")]
+
+
+class _CSVParser:
+    """
+    Turns lines into (line, row) pairs, where line is the number of the line the record starts on.
+    The first record is the header and must contain name and email columns. Quoted fields may span lines.
+
+    Lines are buffered only while csv.reader reports the record as unfinished, and at most
+    IMPORT_MAX_RECORD characters of them. A record that is malformed, too long or still open at
+    the end of the file rejects its first line only; the lines after it are parsed again as
+    records of their own, so one stray quote does not swallow the rest of the file.
+    """
+
+    def __init__(self):
+        self.line = 0
+        self.header = None
+        self._queue = deque()
+        self._record = []
+        self._record_line = 0
+        self._record_size = 0
+        self._final = False
+
+    def feed(self, lines: List[str]) -> List[Tuple[int, Any]]:
+        rows = []
+        for line in lines:
+            self.line += 1
+            self._queue.append((self.line, line))
+        self._drain(rows)
+        return rows
+
+    def finish(self) -> List[Tuple[int, Any]]:
+        rows = []
+        self._final = True
+        self._parse_record(rows)
+        self._drain(rows)
+        if self.header is None:
+            raise ImportFileError("The CSV file is empty.")
+        return rows
+
+    def _drain(self, rows: List[Tuple[int, Any]]) -> None:
+        while self._queue:
+            line_number, line = self._queue.popleft()
+            if not self._record:
+                self._record_line = line_number
+            self._record.append(line)
+            self._record_size += len(line) + 1
+            self._parse_record(rows)
+
+    def _parse_record(self, rows: List[Tuple[int, Any]]) -> None:
+        if not self._record:
+            return
+
+        try:
+            records = list(csv.reader([line + "\n" for line in self._record], strict=True))
+        except csv.Error as e:
+            unfinished = str(e) == "unexpected end of data"
+            last_line = self._final and not self._queue
+            if unfinished and not last_line and self._record_size <= IMPORT_MAX_RECORD:
+                # The record continues on the next line
+                return
+            if self._record_size > IMPORT_MAX_RECORD:
+                reason = f"Record longer than {IMPORT_MAX_RECORD} characters."
+            elif unfinished:
+                reason = "Unterminated quoted field."
+            else:
+                reason = f"Malformed CSV: {e}."
+            if self.header is None:
+                raise ImportFileError(f"Invalid CSV header: {reason}")
+
+            rows.append((self._record_line, ImportFileError(reason)))
+            retry = [(self._record_line + offset, line) for offset, line in enumerate(self._record[1:], 1)]
+            self._queue.extendleft(reversed(retry))
+            self._reset_record()
+            return
+
+        line_number = self._record_line
+        self._reset_record()
+        for fields in records:
+            if not any(field.strip() for field in fields):
+                continue
+            if self.header is None:
+                self.header = [field.strip().lower() for field in fields]
+                if "name" not in self.header or "email" not in self.header:
+                    raise ImportFileError("The CSV header must have name and email columns.")
+                continue
+
+            row = dict(zip(self.header, fields))
+            rows.append((line_number, {"name": row.get("name"), "email": row.get("email")}))
+
+    def _reset_record(self) -> None:
+        self._record = []
+        self._record_size = 0
+
+
+class _NDJSONParser:
+    """
+    Turns lines into (line, row) pairs, one JSON object per non-empty line.
+    """
+
+    def __init__(self):
+        self.line = 0
+
+    def feed(self, lines: List[str]) -> List[Tuple[int, Any]]:
+        rows = []
+        for line in lines:
+            self.line += 1
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as e:
+                row = ImportFileError(f"Invalid JSON: {e}")
+            if not isinstance(row, (dict, ImportFileError)):
+                row = ImportFileError("Expected a JSON object.")
+            rows.append((self.line, row))
+        return rows
+
+    def finish(self) -> List[Tuple[int, Any]]:
+        return []
+
+
+PARSERS = {"csv": _CSVParser, "ndjson": _NDJSONParser}
+
+
+def _validation_reason(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(loc) for loc in detail['loc']) or 'row'}: {detail['msg']}" for detail in error.errors()
+    )
+
+
+class ContactImport:
+    """
+    Imports contacts from a stream of CSV or NDJSON bytes, chunk_size rows per transaction.
+
+    Rows are validated against ContactCreate, loaded into a staging table with COPY and merged
+    into contacts, skipping names and emails that already exist. run() yields events as they happen:
+
+        {"event": "reject", "line": 7, "reason": "email: value is not a valid email address: ..."}
+        {"event": "progress", "rows": 5000, "created": 4990, "duplicates": 9, "invalid": 1}
+        {"event": "done", "rows": ..., "created": ..., "duplicates": ..., "invalid": ...}
+
+    or a final {"event": "error", "detail": ...} when the import stops early. Chunks merged
+    before an error stay imported.
+    """
+
+    def __init__(self, format: str, chunk_size: int = IMPORT_CHUNK_SIZE):
+        self.parser = PARSERS[format]()
+        self.chunk_size = max(1, min(chunk_size, IMPORT_CHUNK_MAX))
+        self.rows = 0
+        self.created = 0
+        self.duplicates = 0
+        self.invalid = 0
+
+    def counts(self) -> dict:
+        return {"rows": self.rows, "created": self.created, "duplicates": self.duplicates, "invalid": self.invalid}
+
+    def _validate(self, rows: List[Tuple[int, Any]], valid: List[Tuple[int, ContactCreate]]) -> List[dict]:
+        rejects = []
+        for line, row in rows:
+            self.rows += 1
+            if isinstance(row, ImportFileError):
+                reason = str(row)
+            else:
+                try:
+                    valid.append((line, ContactCreate(**row)))
+                    continue
+                except ValidationError as e:
+                    reason = _validation_reason(e)
+            self.invalid += 1
+            rejects.append({"event": "reject", "line": line, "reason": reason})
+        return rejects
+
+    async def _merge(self, valid: List[Tuple[int, ContactCreate]]) -> List[dict]:
+        # One pooled connection per chunk, so a slow upload does not hold a connection between chunks
+        async with helium.db.write_conn.connect() as conn:
+            ids = await _copy_contact_batch(conn, valid)
+
+        self.created += len(ids)
+        self.duplicates += len(valid) - len(ids)
+        return [
+            {"event": "reject", "line": line, "reason": "duplicate"}
+            for line, _ in valid
+            if line not in ids
+        ]
+
+    async def run(self, chunks: AsyncIterator[bytes]) -> AsyncIterator[dict]:
+        valid = []
+        try:
+            async for lines in _lines(chunks):
+                for reject in self._validate(self.parser.feed(lines), valid):
+                    yield reject
+                while len(valid) >= self.chunk_size:
+                    for reject in await self._merge(valid[:self.chunk_size]):
+                        yield reject
+                    valid = valid[self.chunk_size:]
+                    yield {"event": "progress", **self.counts()}
+
+            for reject in self._validate(self.parser.finish(), valid):
+                yield reject
+            if valid:
+                for reject in await self._merge(valid):
+                    yield reject
+        except UnicodeDecodeError:
+            yield {"event": "error", "detail": "The file is not valid UTF-8.", **self.counts()}
+            return
+        except ImportFileError as e:
+            yield {"event": "error", "detail": str(e), **self.counts()}
+            return
+        except Exception as e:
+            print(f"ERROR - Contact import failed: {e}")
+            yield {"event": "error", "detail": "The import failed; rows reported before this event were imported.", **self.counts()}
+            return
+
+        yield {"event": "done", **self.counts()}
+
+
+class ImportResponse(StreamingResponse):
+    """
+    Streams import events while the request body is still being read.
+
+    StreamingResponse also listens on receive() for the client disconnecting, which would swallow
+    the request body the import is reading; here a disconnect surfaces through the body stream instead.
+    """
+
+    async def __call__(self, scope, receive, send):
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
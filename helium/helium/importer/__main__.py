@@ -0,0 +1,59 @@
+"""
+Imports contacts from a CSV or NDJSON file straight into the database, without going through the API.
+
+    python -m helium.importer contacts.csv
+    python -m helium.importer --format ndjson --chunk-size 20000 - < contacts.ndjson
+
+CSV files need a header row with name and email columns. Events are printed as NDJSON on stdout,
+one line per rejected row plus progress after every chunk. Exits with status 1 when the import stopped early.
+"""
+import sys
+import json
+import asyncio
+import argparse
+from typing import AsyncIterator, BinaryIO
+
+import helium.db
+from helium.importer import IMPORT_CHUNK_MAX, IMPORT_CHUNK_SIZE, PARSERS, ContactImport
+
+READ_SIZE = 1 << 16
+
+
+async def _read_chunks(file: BinaryIO) -> AsyncIterator[bytes]:
+    while True:
+        chunk = file.read(READ_SIZE)
+        if not chunk:
+            return
+        yield chunk
+
+
+async def _run(args) -> int:
+    contact_import = ContactImport(args.format, chunk_size=args.chunk_size)
+    failed = False
+    helium.db.init_engines()
+    try:
+        await helium.db.create_tables()
+        file = sys.stdin.buffer if args.path == "-" else open(args.path, "rb")
+        with file:
+            async for event in contact_import.run(_read_chunks(file)):
+                print(json.dumps(event), flush=True)
+                failed = failed or event["event"] == "error"
+    finally:
+        await helium.db.dispose_engines()
+    return 1 if failed else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Import contacts from a CSV or NDJSON file.")
+    parser.add_argument("path", help="File to import, or - for stdin.")
+    parser.add_argument("--format", choices=list(PARSERS), default=None, help="Defaults to csv for .csv files, else ndjson.")
+    parser.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK_SIZE, help=f"Rows per transaction (max {IMPORT_CHUNK_MAX}).")
+    args = parser.parse_args()
+    if args.format is None:
+        args.format = "csv" if args.path.lower().endswith(".csv") else "ndjson"
+
+    return asyncio.run(_run(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,267 @@
+import time
+import inspect
+import functools
+import contextvars
+from bisect import bisect_left
+from typing import Callable, Dict, Sequence, Tuple
+
+from sqlalchemy import event # type: ignore
+from sqlalchemy.ext.asyncio import AsyncEngine # type: ignore
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Request and query latency buckets, in seconds
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Name of the CRUD function currently talking to the database, used to label query latency
+db_operation = contextvars.ContextVar("db_operation", default="other")
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def samples(self):
+        """
+        Yields (suffix, label values, extra label, value) for every series of this metric.
+        """
+        return []
+
+    def render(self) -> str:
+        # Counter samples end in _total, and HELP and TYPE have to name them the same way
+        name = f"{self.name}_total" if self.type == "counter" else self.name
+        lines = [f"# HELP {name} {self.documentation}", f"# TYPE {name} {self.type}"]
+        for suffix, labels, extra, value in self.samples():
+            lines.append(
+                f"{name}{suffix}{_format_labels(self.labelnames, labels, extra)} {_format_value(value)}"
+            )
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self):
+        for labels, value in self._values.items():
+            yield "", labels, "", value
+
+
+class Gauge(Metric):
+    type = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def set(self, *labels: str, value: float) -> None:
+        self._values[labels] = value
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, *labels: str, amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) - amount
+
+    def samples(self):
+        for labels, value in self._values.items():
+            yield "", labels, "", value
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per series: [count per bucket (+Inf last), sum, count]
+        self._series: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, *labels: str, value: float) -> None:
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def samples(self):
+        for labels, (counts, total, count) in self._series.items():
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                yield "_bucket", labels, f'le="{_format_value(bound)}"', cumulative
+            yield "_sum", labels, "", total
+            yield "_count", labels, "", count
+
+
+class CallbackMetric(Metric):
+    """
+    Metric whose series are read from a callback at scrape time, for values owned elsewhere.
+    The callback returns a mapping of label value tuples to values.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str],
+        callback: Callable[[], Dict[Tuple[str, ...], float]],
+        type: str = "gauge",
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.callback = callback
+        self.type = type
+
+    def samples(self):
+        for labels, value in self.callback().items():
+            yield "", labels, "", value
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric: Metric) -> Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        return "\n".join(metric.render() for metric in self._metrics) + "\n"
+
+
+REGISTRY = Registry()
+
+http_requests = REGISTRY.register(Counter(
+    "helium_http_requests", "HTTP requests handled, by route and status.", ("method", "route", "status")
+))
+http_request_duration = REGISTRY.register(Histogram(
+    "helium_http_request_duration_seconds", "HTTP request latency, by route.", ("method", "route")
+))
+http_in_flight = REGISTRY.register(Gauge(
+    "helium_http_requests_in_flight", "HTTP requests currently being handled.", ("method",)
+))
+db_query_duration = REGISTRY.register(Histogram(
+    "helium_db_query_duration_seconds", "SQL statement latency, by engine and CRUD function.", ("engine", "operation")
+))
+
+
+def track_operation(fn):
+    """
+    Labels every SQL statement issued while fn runs with fn's name.
+    Works on coroutine functions and async generator functions.
+    """
+    name = fn.__name__
+
+    if inspect.isasyncgenfunction(fn):
+        @functools.wraps(fn)
+        async def generator_wrapper(*args, **kwargs):
+            generator = fn(*args, **kwargs)
+            try:
+                while True:
+                    # Set around each step only, so the label never leaks into the consumer
+                    token = db_operation.set(name)
+                    try:
+                        item = await generator.__anext__()
+                    except StopAsyncIteration:
+                        return
+                    finally:
+                        db_operation.reset(token)
+                    yield item
+            finally:
+                await generator.aclose()
+
+        return generator_wrapper
+
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        token = db_operation.set(name)
+        try:
+            return await fn(*args, **kwargs)
+        finally:
+            db_operation.reset(token)
+
+    return wrapper
+
+
+def instrument_engine(engine: AsyncEngine, name: str) -> None:
+    """
+    Records the latency of every statement run on engine in db_query_duration.
+    """
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        context._metrics_start = time.perf_counter()
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        db_query_duration.observe(
+            name, db_operation.get(), value=time.perf_counter() - context._metrics_start
+        )
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording per-route latency, status counts and in-flight requests.
+    Routes are labelled by their path template, so path parameters do not create new series.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        method = scope["method"]
+        status = 500
+        start = time.perf_counter()
+        http_in_flight.inc(method)
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            http_in_flight.dec(method)
+            route = scope.get("route")
+            path = getattr(route, "path", "<unmatched>")
+            http_request_duration.observe(method, path, value=time.perf_counter() - start)
+            http_requests.inc(method, path, str(status))
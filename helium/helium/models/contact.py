@@ -1,16 +1,48 @@
-from sqlalchemy import Column, String
+from sqlalchemy import Column, String, Index, func, literal_column
 from sqlalchemy.orm import declarative_base
 from sqlalchemy.orm import Mapped, mapped_column
 
 
 Base = declarative_base()
 
+def email_domain(email):
+    """
+    Lower-cased domain part of an email column, as indexed by ix_contacts_email_domain_name_id.
+    The arguments are literals so queries match the index expression under generic prepared plans too.
+    """
+    return func.split_part(func.lower(email), literal_column("'@'"), literal_column("2"))
+
+def name_lower(name):
+    """
+    Lower-cased name in byte-wise order (C collation), as indexed by ix_contacts_name_lower_id.
+    Byte-wise order makes a name prefix a range scan whatever the database collation.
+    """
+    return func.lower(name).collate("C")
+
+def email_lower(email):
+    """
+    Lower-cased email in byte-wise order (C collation), as indexed by ix_contacts_email_lower_id.
+    """
+    return func.lower(email).collate("C")
+
 class Contact(Base):
     __tablename__ = 'contacts'
     
     id: Mapped[int] = mapped_column(primary_key=True)
-    name = Column(String, index=True)
+    name = Column(String, unique=True, index=True)
     email = Column(String, unique=True, index=True)
 
+    # Keyset pagination on /contacts/list by (name, id) is a range scan over the unique ix_contacts_name
+    __table_args__ = (
+        # Trigram indexes back /contacts/search: similarity (%) and ILIKE '%...%' on either column
+        Index("ix_contacts_name_trgm", "name", postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
+        Index("ix_contacts_email_trgm", "email", postgresql_using="gin", postgresql_ops={"email": "gin_trgm_ops"}),
+        # The filters and sort orders of /contacts/list, see LIST_FILTER_SORTS in helium/crud/contact.py
+        Index("ix_contacts_email_domain_name_id", email_domain(email), "name", "id"),
+        # Also walked in order by the database fallback of /contacts/autocomplete
+        Index("ix_contacts_name_lower_id", name_lower(name), "id"),
+        Index("ix_contacts_email_lower_id", email_lower(email), "id"),
+    )
+
     def __repr__(self):
         return f"<Contact(id='{self.id}', name='{self.name}', email='{self.email}')>"
@@ -1,54 +1,321 @@
-from fastapi import APIRouter, HTTPException, Body, Depends
-from typing import List
+import io
+import csv
+from fastapi import APIRouter, HTTPException, Body, Depends, Header, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from typing import List, Literal, Optional
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncEngine
 
 # Assuming these schemas are defined as above
-from helium.schemas.contact import ContactCreate, ContactSchema, ContactOut, ContactResponse, MessageResponse
-from helium.db import get_read_db, get_write_db
+from helium.schemas.contact import (
+    BulkCountResponse,
+    BulkCreateResponse,
+    BulkDeleteRequest,
+    ContactBulkUpdate,
+    ContactCreate,
+    ContactSchema,
+    ContactOut,
+    ContactMatches,
+    ContactPage,
+    ContactSearchResults,
+    ContactResponse,
+    MessageResponse,
+    ReadManyRequest,
+    ReadManyResponse,
+)
+from helium.importer import IMPORT_CHUNK_MAX, IMPORT_CHUNK_SIZE, ContactImport, ImportResponse
+from helium.serialization import FastJSONResponse, dumps
+from helium.tracing import traced
+from helium.db import (
+    CONSISTENCY_HEADER,
+    consistency_token,
+    get_read_engine,
+    get_write_db,
+    parse_consistency_token,
+    use_read_engine,
+    wants_consistency_token,
+)
 from helium.crud.contact import (
+    AUTOCOMPLETE_LIMIT_DEFAULT,
+    AUTOCOMPLETE_LIMIT_MAX,
+    BULK_BATCH_MAX,
+    BULK_BATCH_SIZE,
+    CREATE_COALESCE,
+    LIST_LIMIT_DEFAULT,
+    LIST_LIMIT_MAX,
+    READ_MANY_MAX,
+    SEARCH_LIMIT_DEFAULT,
+    SEARCH_LIMIT_MAX,
+    SEARCH_MIN_LENGTH,
+    create_coalescer,
     _list_contacts,
+    _search_contacts,
+    _autocomplete_contacts,
+    _stream_contacts,
     _create_contact,
+    _bulk_create_contacts,
     _find_contact_by_id,
+    _find_contacts_by_ids,
     _update_contact,
+    _bulk_update_contacts,
     _delete_contact,
+    _bulk_delete_contacts,
 )
 
 router = APIRouter()
 
-# GET route for listing contacts
-@router.get("/list", response_model=List[ContactOut])
-async def list_contacts(db: Session = Depends(get_read_db)):
-    result = await _list_contacts(db)
-    return result or []
+async def _set_consistency_token(response: Response, wants_token: bool) -> None:
+    # Clients send this back on reads to see their own writes
+    if not wants_token:
+        return
+    token = await consistency_token()
+    if token is not None:
+        response.headers[CONSISTENCY_HEADER] = token
+
+# GET route for listing contacts, one keyset page at a time
+@router.get("/list", response_model=ContactPage)
+@traced
+async def list_contacts(
+    limit: int = Query(LIST_LIMIT_DEFAULT, ge=1, le=LIST_LIMIT_MAX),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the previous page's next_cursor."),
+    sort: Literal["name", "-name", "email", "-email", "id", "-id", "name_lower", "-name_lower"] = Query("name"),
+    email: Optional[str] = Query(None, description="Exact email, ignoring case."),
+    email_domain: Optional[str] = Query(None, description="Email domain, ignoring case. Only with sort=name."),
+    name_prefix: Optional[str] = Query(None, description="Start of the name, ignoring case. Only with sort=name_lower."),
+    id_min: Optional[int] = Query(None, description="Smallest id, inclusive. Only with sort=id."),
+    id_max: Optional[int] = Query(None, description="Largest id, inclusive. Only with sort=id."),
+    engine: AsyncEngine = Depends(get_read_engine),
+    token: Optional[str] = Header(None, alias=CONSISTENCY_HEADER),
+):
+    items, next_cursor = await _list_contacts(
+        engine,
+        limit=limit,
+        cursor=cursor,
+        sort=sort,
+        email=email,
+        email_domain=email_domain,
+        name_prefix=name_prefix,
+        id_min=id_min,
+        id_max=id_max,
+        fresh=token is not None,
+    )
+    return FastJSONResponse({"items": items, "next_cursor": next_cursor})
+
+# GET route for fuzzy and substring search over names and emails
+@router.get("/search", response_model=ContactSearchResults)
+@traced
+async def search_contacts(
+    q: str = Query(..., min_length=SEARCH_MIN_LENGTH, max_length=200),
+    limit: int = Query(SEARCH_LIMIT_DEFAULT, ge=1, le=SEARCH_LIMIT_MAX),
+    engine: AsyncEngine = Depends(get_read_engine),
+    token: Optional[str] = Header(None, alias=CONSISTENCY_HEADER),
+):
+    items = await _search_contacts(engine, q, limit=limit, fresh=token is not None)
+    return FastJSONResponse({"items": items})
+
+# GET route for completing a typed prefix of a name or email, served from memory
+@router.get("/autocomplete", response_model=ContactMatches)
+@traced
+async def autocomplete_contacts(
+    prefix: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(AUTOCOMPLETE_LIMIT_DEFAULT, ge=1, le=AUTOCOMPLETE_LIMIT_MAX),
+    engine: AsyncEngine = Depends(get_read_engine),
+    token: Optional[str] = Header(None, alias=CONSISTENCY_HEADER),
+):
+    items = await _autocomplete_contacts(engine, prefix, limit=limit, fresh=token is not None)
+    return FastJSONResponse({"items": items})
+
+# GET route for exporting every contact as NDJSON or CSV
+@router.get("/export", response_class=StreamingResponse)
+@traced
+async def export_contacts(
+    format: Literal["ndjson", "csv"] = Query("ndjson"),
+    token: Optional[str] = Header(None, alias=CONSISTENCY_HEADER),
+):
+    # Rejected here, since errors raised once the body has started streaming cannot become a 400
+    parse_consistency_token(token)
+
+    # The connection is opened inside the generator so it lives as long as the response body
+    async def ndjson_body():
+        async with use_read_engine(autocommit=False, token=token) as engine, engine.connect() as conn:
+            async for chunk in _stream_contacts(conn):
+                yield b"".join(
+                    dumps({"id": id, "name": name, "email": email}) + b"\n"
+                    for id, name, email in chunk
+                )
+
+    async def csv_body():
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(["id", "name", "email"])
+        yield buffer.getvalue()
+        async with use_read_engine(autocommit=False, token=token) as engine, engine.connect() as conn:
+            async for chunk in _stream_contacts(conn):
+                buffer.seek(0)
+                buffer.truncate()
+                writer.writerows(chunk)
+                yield buffer.getvalue()
+
+    if format == "csv":
+        return StreamingResponse(
+            csv_body(),
+            media_type="text/csv",
+            headers={"Content-Disposition": 'attachment; filename="contacts.csv"'},
+        )
+    return StreamingResponse(ndjson_body(), media_type="application/x-ndjson")
 
 # POST route for creating a contact
 @router.post("/create", response_model=ContactResponse, status_code=201)
-async def create_contact(contact: ContactCreate = Body(...), db: Session = Depends(get_write_db)):
-    created_contact = await _create_contact(db, contact)
+@traced
+async def create_contact(
+    response: Response,
+    contact: ContactCreate = Body(...),
+    db: Session = Depends(get_write_db),
+    wants_token: bool = Depends(wants_consistency_token),
+):
+    if CREATE_COALESCE:
+        # The batch fetches one token for all the creates in it that asked for one
+        created_contact, token = await create_coalescer.submit((contact, wants_token))
+        if token is not None:
+            response.headers[CONSISTENCY_HEADER] = token
+    else:
+        created_contact = await _create_contact(db, contact)
+        await _set_consistency_token(response, wants_token)
     return created_contact
 
+# POST route for creating many contacts in batched multi-row inserts
+@router.post("/bulk", response_model=BulkCreateResponse)
+@traced
+async def bulk_create_contacts(
+    response: Response,
+    contacts: List[ContactCreate] = Body(...),
+    batch_size: int = Query(BULK_BATCH_SIZE, ge=1, le=BULK_BATCH_MAX),
+    db: Session = Depends(get_write_db),
+    wants_token: bool = Depends(wants_consistency_token),
+):
+    ids = await _bulk_create_contacts(db, contacts, batch_size=batch_size)
+    results = [
+        {"index": index, "status": "duplicate" if id is None else "created", "id": id}
+        for index, id in enumerate(ids)
+    ]
+    created = sum(1 for id in ids if id is not None)
+    await _set_consistency_token(response, wants_token)
+    return {"created": created, "duplicates": len(ids) - created, "results": results}
+
+# POST route for importing a CSV or NDJSON file streamed as the request body
+@router.post("/import", response_class=StreamingResponse)
+@traced
+async def import_contacts(
+    request: Request,
+    format: Literal["ndjson", "csv"] = Query("ndjson"),
+    chunk_size: int = Query(IMPORT_CHUNK_SIZE, ge=1, le=IMPORT_CHUNK_MAX),
+    wants_token: bool = Depends(wants_consistency_token),
+):
+    # The body is read while events stream back, so neither side is held in memory
+    async def events():
+        async for event in ContactImport(format, chunk_size=chunk_size).run(request.stream()):
+            if event["event"] == "done" and wants_token:
+                token = await consistency_token()
+                if token is not None:
+                    event["consistency_token"] = token
+            yield dumps(event) + b"\n"
+
+    return ImportResponse(events(), media_type="application/x-ndjson")
+
 # GET route for reading a specific contact by ID
 @router.get("/read/{contact_id}", response_model=ContactOut)
-async def read_contact(contact_id: int, db: Session = Depends(get_read_db)):
-    result = await _find_contact_by_id(db, contact_id)
+@traced
+async def read_contact(
+    contact_id: int,
+    engine: AsyncEngine = Depends(get_read_engine),
+    token: Optional[str] = Header(None, alias=CONSISTENCY_HEADER),
+):
+    result = await _find_contact_by_id(engine, contact_id, fresh=token is not None)
     if not result:
         raise HTTPException(status_code=404, detail="Contact not found")
-    return result
+    return FastJSONResponse(result)
+
+# GET and POST routes for reading many contacts by ID in one round trip
+@router.get("/read-many", response_model=ReadManyResponse)
+@traced
+async def read_many_contacts(
+    ids: List[int] = Query(
+        ..., max_length=READ_MANY_MAX, description=f"Repeat for every id, e.g. ids=1&ids=2; at most {READ_MANY_MAX}."
+    ),
+    engine: AsyncEngine = Depends(get_read_engine),
+    token: Optional[str] = Header(None, alias=CONSISTENCY_HEADER),
+):
+    items, missing = await _find_contacts_by_ids(engine, ids, fresh=token is not None)
+    return FastJSONResponse({"items": items, "missing": missing})
+
+# POST for id lists too long for a URL
+@router.post("/read-many", response_model=ReadManyResponse)
+@traced
+async def read_many_contacts_post(
+    request: ReadManyRequest = Body(...),
+    engine: AsyncEngine = Depends(get_read_engine),
+    token: Optional[str] = Header(None, alias=CONSISTENCY_HEADER),
+):
+    items, missing = await _find_contacts_by_ids(engine, request.ids, fresh=token is not None)
+    return FastJSONResponse({"items": items, "missing": missing})
 
 # PUT or PATCH route for updating a contact
 @router.put("/update/{contact_id}", response_model=MessageResponse)
-async def update_contact(contact_id: int, db: Session = Depends(get_write_db), contact_data: ContactSchema = Body(...)):
+@traced
+async def update_contact(
+    response: Response,
+    contact_id: int,
+    db: Session = Depends(get_write_db),
+    contact_data: ContactSchema = Body(...),
+    wants_token: bool = Depends(wants_consistency_token),
+):
     updated_count = await _update_contact(db, contact_id, contact_data.dict())
     if updated_count == 0:
         raise HTTPException(status_code=404, detail="Contact not found")
+    await _set_consistency_token(response, wants_token)
     
     return {"message": "Contact updated successfully."}
 
+# PATCH route for updating many contacts with set-based statements
+@router.patch("/bulk", response_model=BulkCountResponse)
+@traced
+async def bulk_update_contacts(
+    response: Response,
+    contacts: List[ContactBulkUpdate] = Body(...),
+    batch_size: int = Query(BULK_BATCH_SIZE, ge=1, le=BULK_BATCH_MAX),
+    db: Session = Depends(get_write_db),
+    wants_token: bool = Depends(wants_consistency_token),
+):
+    updated_count = await _bulk_update_contacts(db, contacts, batch_size=batch_size)
+    await _set_consistency_token(response, wants_token)
+    return {"affected": updated_count}
+
 # DELETE route for deleting a contact
 @router.delete("/delete/{contact_id}", response_model=MessageResponse)
-async def delete_contact(contact_id: int, db: Session = Depends(get_write_db)):
+@traced
+async def delete_contact(
+    response: Response,
+    contact_id: int,
+    db: Session = Depends(get_write_db),
+    wants_token: bool = Depends(wants_consistency_token),
+):
     deleted_count = await _delete_contact(db, contact_id)
     if deleted_count == 0:
         raise HTTPException(status_code=404, detail="Contact not found")
+    await _set_consistency_token(response, wants_token)
     
     return {"message": "Contact deleted successfully."}
+
+# POST route for deleting many contacts with set-based statements
+@router.post("/bulk-delete", response_model=BulkCountResponse)
+@traced
+async def bulk_delete_contacts(
+    response: Response,
+    request: BulkDeleteRequest = Body(...),
+    batch_size: int = Query(BULK_BATCH_SIZE, ge=1, le=BULK_BATCH_MAX),
+    db: Session = Depends(get_write_db),
+    wants_token: bool = Depends(wants_consistency_token),
+):
+    deleted_count = await _bulk_delete_contacts(db, request.ids, batch_size=batch_size)
+    await _set_consistency_token(response, wants_token)
+    return {"affected": deleted_count}
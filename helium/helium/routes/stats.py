@@ -0,0 +1,51 @@
+from typing import Optional
+from fastapi import APIRouter, HTTPException
+
+from helium import startup, tracing
+
+from helium.db import pool_stats, reader_stats
+from helium.crud.contact import autocomplete, contact_cache, create_coalescer, read_flight
+
+router = APIRouter()
+
+# GET route for the contact read-through cache counters, used to size HELIUM_CACHE_SIZE / HELIUM_CACHE_TTL
+@router.get("/cache")
+async def cache_stats():
+    return contact_cache.stats()
+
+# GET route for the single-flight read coalescing counters
+@router.get("/single-flight")
+async def single_flight_stats():
+    return read_flight.stats()
+
+# GET route for the autocomplete index: readiness, size and last build
+@router.get("/autocomplete")
+async def autocomplete_stats():
+    return autocomplete.stats()
+
+# GET route for the group-commit create batching counters and batch size histogram
+@router.get("/create-coalescer")
+async def create_coalescer_stats():
+    return create_coalescer.stats()
+
+# GET route for live read/write connection pool statistics
+@router.get("/pools")
+async def pools():
+    return pool_stats()
+
+# GET route for recent spans, when HELIUM_TRACE_EXPORTER=memory
+@router.get("/traces")
+async def traces(trace_id: Optional[str] = None):
+    if not isinstance(tracing.exporter, tracing.InMemoryExporter):
+        raise HTTPException(status_code=404, detail="In-memory trace exporter is not enabled.")
+    return tracing.exporter.traces(trace_id)
+
+# GET route for reader rotation: health, replica lag and outstanding requests per reader
+@router.get("/readers")
+async def readers():
+    return reader_stats()
+
+# GET route for this worker's cold start report
+@router.get("/startup")
+async def startup_report():
+    return startup.report
@@ -1,5 +1,11 @@
+import os
+from typing import List, Literal, Optional
 from pydantic import BaseModel, Field, EmailStr
 
+# Most ids one multi-get may ask for; keeps the ANY(:ids) array and the response bounded.
+# Longer lists are rejected by validation before their items are parsed
+READ_MANY_MAX = int(os.getenv("HELIUM_READ_MANY_MAX", 500))
+
 class ContactSchema(BaseModel):
     name: str
     email: EmailStr
@@ -7,6 +13,9 @@ class ContactSchema(BaseModel):
 class ContactCreate(ContactSchema):
     pass
 
+class ContactBulkUpdate(ContactSchema):
+    id: int
+
 class ContactOut(ContactSchema):
     id: int
 
@@ -14,8 +23,44 @@ class ContactOut(ContactSchema):
         from_attributes = True
         populate_by_name = True
 
+class ContactPage(BaseModel):
+    items: List[ContactOut]
+    next_cursor: Optional[str] = None
+
+class ContactMatches(BaseModel):
+    items: List[ContactOut]
+
+class ContactSearchHit(ContactOut):
+    score: float
+
+class ContactSearchResults(BaseModel):
+    items: List[ContactSearchHit]
+
 class ContactResponse(ContactSchema):
     id: int
 
+class BulkCreateItem(BaseModel):
+    index: int
+    status: Literal["created", "duplicate"]
+    id: Optional[int] = None
+
+class BulkCreateResponse(BaseModel):
+    created: int
+    duplicates: int
+    results: List[BulkCreateItem]
+
+class BulkDeleteRequest(BaseModel):
+    ids: List[int]
+
+class ReadManyRequest(BaseModel):
+    ids: List[int] = Field(..., max_length=READ_MANY_MAX)
+
+class ReadManyResponse(BaseModel):
+    items: List[ContactOut]
+    missing: List[int]
+
+class BulkCountResponse(BaseModel):
+    affected: int
+
 class MessageResponse(BaseModel):
     message: str
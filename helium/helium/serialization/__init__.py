@@ -0,0 +1,32 @@
+import json
+from typing import Any
+
+from fastapi.responses import Response
+
+try:
+    import orjson
+except ImportError: # pragma: no cover - declared in pyproject.toml, the json module covers installs without it
+    orjson = None
+
+
+def dumps(content: Any) -> bytes:
+    """
+    Serializes plain JSON data straight to bytes, with orjson when it is installed.
+    """
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+class FastJSONResponse(Response):
+    """
+    JSON response for content that is already plain dicts/lists of JSON types.
+
+    Returning it from a route skips response_model validation and FastAPI's jsonable_encoder,
+    while the route's response_model still documents the shape in the OpenAPI schema.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
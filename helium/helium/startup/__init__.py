@@ -0,0 +1,28 @@
+import json
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+# Cold start report of this worker: seconds spent in each step, in the order they ran,
+# plus whether the schema had to be created
+report = {}
+
+
+def record(step: str, seconds: float) -> None:
+    report[step] = round(seconds, 4)
+
+
+@contextmanager
+def timed(step: str) -> Iterator[None]:
+    """
+    Records how long the block takes as a cold start step.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(step, time.perf_counter() - start)
+
+
+def log_report() -> None:
+    print(f"INFO - Startup: {json.dumps(report)}")
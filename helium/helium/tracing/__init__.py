@@ -0,0 +1,292 @@
+import os
+import re
+import json
+import time
+import queue
+import atexit
+import random
+import inspect
+import threading
+import functools
+import contextvars
+from collections import deque
+from contextlib import contextmanager
+from typing import Iterator, List, Optional
+
+from sqlalchemy import event # type: ignore
+from sqlalchemy.ext.asyncio import AsyncEngine # type: ignore
+
+# none | memory | file - tracing costs nothing beyond a None check while the exporter is none
+TRACE_EXPORTER = os.getenv("HELIUM_TRACE_EXPORTER", "none").lower()
+TRACE_FILE = os.getenv("HELIUM_TRACE_FILE", "traces.jsonl")
+TRACE_MEMORY_SPANS = int(os.getenv("HELIUM_TRACE_MEMORY_SPANS", 10000))
+
+_TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+current_span = contextvars.ContextVar("current_span", default=None)
+
+
+class Span:
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "start_ns", "end_ns", "attributes", "status")
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str] = None, attributes: Optional[dict] = None):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.attributes = attributes or {}
+        self.status = "ok"
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_ns": self.start_ns,
+            "duration_ms": (self.end_ns - self.start_ns) / 1e6 if self.end_ns else None,
+            "status": self.status,
+            "attributes": self.attributes,
+        }
+
+
+class InMemoryExporter:
+    """
+    Keeps the most recent finished spans in memory, for local debugging.
+    """
+
+    def __init__(self, maxlen: int = TRACE_MEMORY_SPANS):
+        self.spans = deque(maxlen=maxlen)
+
+    def export(self, span: Span) -> None:
+        self.spans.append(span)
+
+    def traces(self, trace_id: Optional[str] = None) -> List[dict]:
+        return [span.to_dict() for span in self.spans if trace_id is None or span.trace_id == trace_id]
+
+
+class FileExporter:
+    """
+    Appends finished spans as JSON lines to a file, written by a background thread.
+    """
+
+    def __init__(self, path: str = TRACE_FILE):
+        self.path = path
+        self._queue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._write, name="helium-trace-exporter", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def export(self, span: Span) -> None:
+        self._queue.put(span)
+
+    def _write(self) -> None:
+        with open(self.path, "a") as f:
+            while True:
+                span = self._queue.get()
+                if span is None:
+                    return
+                f.write(json.dumps(span.to_dict()) + "\n")
+                if self._queue.empty():
+                    f.flush()
+
+    def close(self) -> None:
+        self._queue.put(None)
+        self._thread.join(timeout=5)
+
+
+exporter = None
+
+
+def set_exporter(new_exporter) -> None:
+    """
+    Installs the exporter that receives finished spans; None turns tracing off.
+    Any object with an export(span) method will do.
+    """
+    global exporter
+    exporter = new_exporter
+
+
+if TRACE_EXPORTER == "memory":
+    set_exporter(InMemoryExporter())
+elif TRACE_EXPORTER == "file":
+    set_exporter(FileExporter())
+
+
+def parse_traceparent(header: Optional[str]):
+    """
+    Returns (trace_id, parent span id) from a W3C traceparent header, or None if it is missing or invalid.
+    """
+    match = _TRACEPARENT.match(header.strip().lower()) if header else None
+    if not match or match.group(1) == "0" * 32 or match.group(2) == "0" * 16:
+        return None
+    return match.group(1), match.group(2)
+
+
+def _new_span(name: str, attributes: Optional[dict] = None) -> Span:
+    parent = current_span.get()
+    if parent is None:
+        return Span(name, f"{random.getrandbits(128):032x}", attributes=attributes)
+    return Span(name, parent.trace_id, parent.span_id, attributes)
+
+
+def _finish(span: Span) -> None:
+    span.end_ns = time.time_ns()
+    if exporter is not None:
+        exporter.export(span)
+
+
+@contextmanager
+def start_span(name: str, **attributes) -> Iterator[Optional[Span]]:
+    """
+    Runs the block inside a child span of the current span. Yields None when tracing is off.
+    """
+    if exporter is None:
+        yield None
+        return
+
+    span = _new_span(name, attributes)
+    token = current_span.set(span)
+    try:
+        yield span
+    except BaseException as e:
+        span.status = "error"
+        span.attributes["error"] = type(e).__name__
+        raise
+    finally:
+        current_span.reset(token)
+        _finish(span)
+
+
+def traced(fn):
+    """
+    Wraps a coroutine function or async generator function in a span named after it.
+    """
+    name = fn.__qualname__
+
+    if inspect.isasyncgenfunction(fn):
+        @functools.wraps(fn)
+        async def generator_wrapper(*args, **kwargs):
+            if exporter is None:
+                async for item in fn(*args, **kwargs):
+                    yield item
+                return
+
+            span = _new_span(name)
+            generator = fn(*args, **kwargs)
+            try:
+                while True:
+                    # Current only while the generator runs, so the span never leaks into the consumer
+                    token = current_span.set(span)
+                    try:
+                        item = await generator.__anext__()
+                    except StopAsyncIteration:
+                        return
+                    finally:
+                        current_span.reset(token)
+                    yield item
+            except BaseException as e:
+                span.status = "error"
+                span.attributes["error"] = type(e).__name__
+                raise
+            finally:
+                await generator.aclose()
+                _finish(span)
+
+        return generator_wrapper
+
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        if exporter is None:
+            return await fn(*args, **kwargs)
+        with start_span(name):
+            return await fn(*args, **kwargs)
+
+    return wrapper
+
+
+def instrument_engine(engine: AsyncEngine, name: str) -> None:
+    """
+    Records a span for every SQL statement run on engine, as a child of the current span.
+    """
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if exporter is not None and current_span.get() is not None:
+            context._trace_span = _new_span("sql", {"db.engine": name, "db.statement": statement})
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        span = getattr(context, "_trace_span", None)
+        if span is not None:
+            span.attributes["db.rows"] = cursor.rowcount
+            _finish(span)
+            context._trace_span = None
+
+    @event.listens_for(engine.sync_engine, "handle_error")
+    def handle_error(exception_context):
+        span = getattr(exception_context.execution_context, "_trace_span", None)
+        if span is not None:
+            span.status = "error"
+            span.attributes["error"] = type(exception_context.original_exception).__name__
+            _finish(span)
+            exception_context.execution_context._trace_span = None
+
+
+class TracingMiddleware:
+    """
+    ASGI middleware opening the root span of each request.
+    Continues the caller's trace from an incoming traceparent header and returns the
+    request span's traceparent on the response.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or exporter is None:
+            return await self.app(scope, receive, send)
+
+        incoming = None
+        for key, value in scope["headers"]:
+            if key == b"traceparent":
+                incoming = parse_traceparent(value.decode("latin-1"))
+                break
+
+        method = scope["method"]
+        if incoming:
+            span = Span(f"{method} {scope['path']}", incoming[0], incoming[1])
+        else:
+            span = Span(f"{method} {scope['path']}", f"{random.getrandbits(128):032x}")
+        span.attributes["http.method"] = method
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                span.attributes["http.status_code"] = message["status"]
+                if message["status"] >= 500:
+                    span.status = "error"
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"traceparent", span.traceparent.encode())
+                ]
+            await send(message)
+
+        token = current_span.set(span)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except BaseException as e:
+            span.status = "error"
+            span.attributes["error"] = type(e).__name__
+            raise
+        finally:
+            current_span.reset(token)
+            route = scope.get("route")
+            if route is not None:
+                span.name = f"{method} {route.path}"
+                span.attributes["http.route"] = route.path
+            _finish(span)
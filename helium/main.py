@@ -1,5 +1,7 @@
 import os
+import math
 import argparse
+import importlib.util
 
 import uvicorn
 
@@ -7,24 +9,81 @@ service_name = "helium"
 HOST = "0.0.0.0"
 PORT = os.getenv("PORT", 8000)
 
+def cpu_limit() -> int:
+    """
+    CPU cores this process may use: the container's cgroup CPU quota rounded up, or every core when there is none.
+    os.cpu_count() alone reports the node's cores, so a pod limited to 200m would start a worker per node core.
+    """
+    cores = os.cpu_count() or 1
+    try:
+        # cgroup v2: "<quota> <period>", or "max <period>" when unlimited
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()[:2]
+    except (OSError, ValueError):
+        try:
+            # cgroup v1: a quota of -1 means unlimited
+            with open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us") as f:
+                quota = f.read().strip()
+            with open("/sys/fs/cgroup/cpu/cpu.cfs_period_us") as f:
+                period = f.read().strip()
+        except OSError:
+            return cores
+    if quota in ("max", "-1"):
+        return cores
+    try:
+        return max(1, min(cores, math.ceil(int(quota) / int(period))))
+    except (ValueError, ZeroDivisionError):
+        return cores
+
+# Production defaults to one worker process per CPU core the container may use
+WORKERS = os.getenv("WEB_CONCURRENCY", cpu_limit())
+# Seconds in-flight requests get to finish after SIGTERM before workers are stopped
+GRACEFUL_TIMEOUT = os.getenv("GRACEFUL_TIMEOUT", 30)
+
 global __local
 __local = False # Default to False, will be set to True if --local is passed
 
 args = argparse.ArgumentParser()
-args.add_argument("--local", action="store_true", default=HOST, help="Pass this to set the environment to local.")
+args.add_argument("--local", action="store_true", default=False, help="Pass this to set the environment to local.")
+args.add_argument("--workers", type=int, default=None, help="Number of worker processes in production (default: CPU limit of the container).")
 
 parser = args.parse_args()
 if parser.local:
     __local = True
+    # Read by helium.db in the server process, which the reloader starts with this environment
+    os.environ["HELIUM_LOCAL_DB"] = "true"
 
 if isinstance(PORT, str):
     PORT = int(PORT)
 
+if isinstance(WORKERS, str):
+    WORKERS = int(WORKERS)
+
+if isinstance(GRACEFUL_TIMEOUT, str):
+    GRACEFUL_TIMEOUT = int(GRACEFUL_TIMEOUT)
+
+if parser.workers:
+    WORKERS = parser.workers
+
 if __name__ == "__main__":
-    uvicorn.run(
-        f"{service_name}.app:app",
-        host=HOST,
-        port=PORT,
-        reload=True,
-        log_level="info",
-    )
+    if __local:
+        # Single process with the file-watcher reloader, for development only
+        uvicorn.run(
+            f"{service_name}.app:app",
+            host=HOST,
+            port=PORT,
+            reload=True,
+            log_level="info",
+        )
+    else:
+        uvicorn.run(
+            f"{service_name}.app:app",
+            host=HOST,
+            port=PORT,
+            workers=WORKERS,
+            loop="uvloop" if importlib.util.find_spec("uvloop") else "asyncio",
+            http="httptools" if importlib.util.find_spec("httptools") else "h11",
+            # On SIGTERM stop accepting connections and let in-flight requests drain
+            timeout_graceful_shutdown=GRACEFUL_TIMEOUT,
+            log_level="info",
+        )
@@ -0,0 +1,83 @@
+"""
+Benchmarks the contacts API, in-process through the ASGI transport or over real HTTP.
+
+    python -m tests.benchmarks --requests 1000 --concurrency 50 --save baseline.json
+    python -m tests.benchmarks --base-url http://localhost:8000 --baseline baseline.json --threshold 0.2
+
+Exits with status 1 when any scenario regressed beyond the threshold against the baseline.
+Needs httpx, which is not a runtime dependency: `pip install httpx`.
+"""
+import sys
+import json
+import asyncio
+import argparse
+import contextlib
+
+import httpx
+
+from tests.benchmarks.harness import compare, run_scenario
+from tests.benchmarks.scenarios import SCENARIOS, Scenarios
+
+
+@contextlib.asynccontextmanager
+async def _client(base_url):
+    if base_url:
+        async with httpx.AsyncClient(base_url=base_url, timeout=30) as client:
+            yield client
+        return
+
+    # Imported here so benchmarking a remote server does not need the database settings
+    from helium.app import app
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://helium", timeout=30) as client:
+            yield client
+
+
+async def _run(args) -> dict:
+    scenarios = Scenarios(args.requests)
+    results = {}
+    async with _client(args.base_url) as client:
+        await scenarios.seed(client)
+        try:
+            for name in SCENARIOS:
+                if name not in args.scenarios:
+                    continue
+                results[name] = await run_scenario(client, scenarios.get(name), args.requests, args.concurrency)
+                print(f"{name:>8}: {json.dumps(results[name])}", file=sys.stderr)
+        finally:
+            await scenarios.cleanup(client)
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the Helium contacts API.")
+    parser.add_argument("--base-url", default=None, help="Benchmark a running server instead of the in-process app.")
+    parser.add_argument("--requests", type=int, default=500, help="Requests per scenario.")
+    parser.add_argument("--concurrency", type=int, default=20, help="Requests in flight at once.")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--save", default=None, help="Write the results as a JSON baseline to this path.")
+    parser.add_argument("--baseline", default=None, help="Compare against a JSON baseline from an earlier run.")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed regression, as a fraction (0.2 = 20%%).")
+    args = parser.parse_args()
+
+    results = asyncio.run(_run(args))
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION - {regression}", file=sys.stderr)
+        if regressions:
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
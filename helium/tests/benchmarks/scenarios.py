@@ -0,0 +1,62 @@
+import uuid
+from typing import Dict, List
+
+import httpx
+
+from tests.benchmarks.harness import RequestFn
+
+
+class Scenarios:
+    """
+    Request functions for each contacts API scenario, sharing one set of seeded contacts.
+
+    Every run uses a fresh name prefix, so runs never collide with each other or with real data.
+    """
+
+    def __init__(self, requests: int):
+        self.requests = requests
+        self.prefix = f"bench-{uuid.uuid4().hex[:8]}"
+        self.ids: List[int] = []
+
+    def _contact(self, tag: str, index: int) -> Dict[str, str]:
+        return {"name": f"{self.prefix}-{tag}-{index}", "email": f"{self.prefix}-{tag}-{index}@bench.example.com"}
+
+    async def seed(self, client: httpx.AsyncClient) -> None:
+        """
+        Creates the contacts that the read, update and delete scenarios work on.
+        """
+        contacts = [self._contact("seed", index) for index in range(self.requests)]
+        response = await client.post("/contacts/bulk", json=contacts)
+        response.raise_for_status()
+        self.ids = [item["id"] for item in response.json()["results"] if item["id"] is not None]
+
+    async def cleanup(self, client: httpx.AsyncClient) -> None:
+        if self.ids:
+            await client.post("/contacts/bulk-delete", json={"ids": self.ids})
+
+    async def create(self, client: httpx.AsyncClient, index: int) -> httpx.Response:
+        response = await client.post("/contacts/create", json=self._contact("create", index))
+        if response.status_code == 201:
+            self.ids.append(response.json()["id"])
+        return response
+
+    async def read(self, client: httpx.AsyncClient, index: int) -> httpx.Response:
+        return await client.get(f"/contacts/read/{self.ids[index % len(self.ids)]}")
+
+    async def list(self, client: httpx.AsyncClient, index: int) -> httpx.Response:
+        return await client.get("/contacts/list", params={"limit": 100})
+
+    async def update(self, client: httpx.AsyncClient, index: int) -> httpx.Response:
+        contact_id = self.ids[index % len(self.ids)]
+        return await client.put(f"/contacts/update/{contact_id}", json=self._contact("update", contact_id))
+
+    async def delete(self, client: httpx.AsyncClient, index: int) -> httpx.Response:
+        # Deletes run last and consume the seeded contacts one by one
+        return await client.delete(f"/contacts/delete/{self.ids[index % len(self.ids)]}")
+
+    def get(self, name: str) -> RequestFn:
+        return getattr(self, name)
+
+
+# Run order matters - delete consumes what the other scenarios read and update
+SCENARIOS = ("create", "read", "list", "update", "delete")
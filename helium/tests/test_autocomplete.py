@@ -0,0 +1,78 @@
+import asyncio
+
+from helium.autocomplete import TERM_BYTES, Autocomplete, PrefixIndex
+
+
+CONTACTS = [(1, "Ann", "ann@x.com"), (2, "Anna", "zed@x.com"), (3, "Bob", "bob@y.com")]
+
+
+def _source(contacts=CONTACTS, chunk_size=2):
+    def source():
+        async def chunks():
+            terms = sorted(
+                (value.lower()[:TERM_BYTES].encode(), contact_id)
+                for contact_id, name, email in contacts
+                for value in (name, email)
+            )
+            for start in range(0, len(terms), chunk_size):
+                yield [(contact_id, term.decode()) for term, contact_id in terms[start:start + chunk_size]]
+        return chunks()
+    return source
+
+
+def _built(contacts=CONTACTS, max_entries=100):
+    autocomplete = Autocomplete(max_entries=max_entries, refresh=0)
+    asyncio.run(autocomplete.rebuild(_source(contacts)))
+    return autocomplete
+
+
+def test_complete_in_term_order():
+    autocomplete = _built()
+    assert autocomplete.complete("AN", 10) == [1, 2]
+    assert autocomplete.complete("z", 10) == [2]
+    assert autocomplete.complete("an", 1) == [1]
+    assert autocomplete.complete("c", 10) == []
+
+
+def test_long_prefix_is_not_answered():
+    assert _built().complete("a" * (TERM_BYTES + 1), 10) is None
+
+
+def test_writes_after_build():
+    autocomplete = _built()
+    autocomplete.set(2, "Bea", "bea@x.com")
+    autocomplete.set(4, "Andy", "andy@x.com")
+    autocomplete.remove(1)
+    assert autocomplete.complete("an", 10) == [4]
+    assert autocomplete.complete("b", 10) == [2, 3]
+
+
+def test_out_of_order_terms_go_to_the_overlay():
+    index = PrefixIndex()
+    index.append(1, "b")
+    index.append(2, "a")
+    assert index.complete("", 10) == [2, 1]
+
+
+def test_build_gives_up_above_max_entries():
+    autocomplete = _built(max_entries=4)
+    assert autocomplete.complete("an", 10) is None
+    assert "more than 4" in autocomplete.last_error
+
+
+def test_estimate_skips_reading_the_table():
+    def source():
+        raise AssertionError("the table should not be read")
+
+    async def estimate():
+        return 1000
+
+    autocomplete = Autocomplete(max_entries=100, refresh=0)
+    asyncio.run(autocomplete.rebuild(source, estimate))
+    assert autocomplete.index is None and "about 1000" in autocomplete.last_error
+
+
+def test_writes_beyond_max_entries_drop_the_index():
+    autocomplete = _built(max_entries=6)
+    autocomplete.set(4, "Cy", "cy@x.com")
+    assert autocomplete.complete("cy", 10) is None
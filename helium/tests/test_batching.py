@@ -0,0 +1,122 @@
+import asyncio
+
+import pytest
+
+from helium.batching import BatchCoalescer
+
+
+def _coalescer(window=0.01, max_batch=100, fail=None):
+    """
+    A coalescer whose flush records every batch and doubles each item.
+    Items listed in fail come back as a ValueError; fail="batch" fails the whole flush.
+    """
+    batches = []
+
+    async def flush(items):
+        batches.append(list(items))
+        if fail == "batch":
+            raise RuntimeError("flush failed")
+        return [ValueError(item) if fail and item in fail else item * 2 for item in items]
+
+    return BatchCoalescer(flush, window=window, max_batch=max_batch), batches
+
+
+def test_items_within_the_window_share_a_batch():
+    coalescer, batches = _coalescer()
+
+    async def submit():
+        return await asyncio.gather(*(coalescer.submit(item) for item in range(5)))
+
+    assert asyncio.run(submit()) == [0, 2, 4, 6, 8]
+    assert batches == [[0, 1, 2, 3, 4]]
+    assert coalescer.stats()["batch_size_histogram"]["5"] == 1
+
+
+def test_full_batch_flushes_before_the_window():
+    coalescer, batches = _coalescer(window=10, max_batch=3)
+
+    async def submit():
+        return await asyncio.wait_for(asyncio.gather(*(coalescer.submit(item) for item in range(3))), 1)
+
+    assert asyncio.run(submit()) == [0, 2, 4]
+    assert batches == [[0, 1, 2]]
+
+
+def test_items_after_a_full_batch_start_the_next_one():
+    coalescer, batches = _coalescer(max_batch=2)
+
+    async def submit():
+        return await asyncio.gather(*(coalescer.submit(item) for item in range(5)))
+
+    assert asyncio.run(submit()) == [0, 2, 4, 6, 8]
+    assert batches == [[0, 1], [2, 3], [4]]
+    assert coalescer.stats()["mean_batch_size"] == 5 / 3
+
+
+def test_failing_item_fails_only_its_caller():
+    coalescer, _ = _coalescer(fail={1})
+
+    async def submit():
+        return await asyncio.gather(*(coalescer.submit(item) for item in range(3)), return_exceptions=True)
+
+    first, second, third = asyncio.run(submit())
+    assert (first, third) == (0, 4)
+    assert isinstance(second, ValueError)
+
+
+def test_failing_flush_fails_the_whole_batch():
+    coalescer, _ = _coalescer(fail="batch")
+
+    async def submit():
+        return await asyncio.gather(*(coalescer.submit(item) for item in range(3)), return_exceptions=True)
+
+    assert all(isinstance(result, RuntimeError) for result in asyncio.run(submit()))
+
+
+def test_close_flushes_pending_items():
+    coalescer, batches = _coalescer(window=10)
+
+    async def submit_and_close():
+        submitted = asyncio.ensure_future(coalescer.submit(21))
+        await asyncio.sleep(0)
+        await asyncio.wait_for(coalescer.close(), 1)
+        return await submitted
+
+    assert asyncio.run(submit_and_close()) == 42
+    assert batches == [[21]]
+    assert coalescer.stats()["pending"] == 0
+
+
+def test_close_waits_for_batches_in_flight():
+    finished = []
+
+    async def flush(items):
+        await asyncio.sleep(0.01)
+        finished.extend(items)
+        return items
+
+    coalescer = BatchCoalescer(flush, window=0, max_batch=1)
+
+    async def submit_and_close():
+        submitted = asyncio.ensure_future(coalescer.submit(1))
+        await asyncio.sleep(0)
+        await coalescer.close()
+        assert finished == [1]
+        return await submitted
+
+    assert asyncio.run(submit_and_close()) == 1
+
+
+def test_cancelled_caller_does_not_break_the_batch():
+    coalescer, _ = _coalescer()
+
+    async def submit():
+        cancelled = asyncio.ensure_future(coalescer.submit(1))
+        kept = asyncio.ensure_future(coalescer.submit(2))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await cancelled
+        return await kept
+
+    assert asyncio.run(submit()) == 4
@@ -0,0 +1,120 @@
+import asyncio
+
+import pytest
+
+from helium.cache import LRUCache, SingleFlight
+
+
+def test_invalidation_drops_only_loads_of_that_key():
+    cache = LRUCache(maxsize=10, ttl=60)
+    generation = cache.generation
+    cache.invalidate(1)
+    cache.set(1, "stale", generation=generation)
+    cache.set(2, "fresh", generation=generation)
+    assert cache.get(1) is None
+    assert cache.get(2) == "fresh"
+
+
+def test_load_started_after_invalidation_is_stored():
+    cache = LRUCache(maxsize=10, ttl=60)
+    cache.invalidate(1)
+    generation = cache.generation
+    cache.set(1, "fresh", generation=generation)
+    assert cache.get(1) == "fresh"
+
+
+def test_forgotten_invalidations_drop_older_loads():
+    cache = LRUCache(maxsize=2, ttl=60)
+    generation = cache.generation
+    for key in (1, 2, 3):
+        cache.invalidate(key)
+    # Key 1 is no longer tracked, so a load from before its invalidation cannot be trusted
+    cache.set(1, "stale", generation=generation)
+    assert cache.get(1) is None
+    cache.set(4, "fresh", generation=cache.generation)
+    assert cache.get(4) == "fresh"
+
+
+def test_clear_drops_every_load_in_flight():
+    cache = LRUCache(maxsize=10, ttl=60)
+    generation = cache.generation
+    cache.clear()
+    cache.set(5, "stale", generation=generation)
+    assert cache.get(5) is None
+
+
+def _counted(result=None, error=None, delay=0.01):
+    calls = []
+
+    async def fn():
+        calls.append(None)
+        await asyncio.sleep(delay)
+        if error is not None:
+            raise error
+        return result
+
+    return fn, calls
+
+
+def test_concurrent_calls_share_one_result():
+    flight = SingleFlight()
+    fn, calls = _counted(result="row")
+
+    async def callers():
+        return await asyncio.gather(*(flight.do("key", fn) for _ in range(10)))
+
+    assert asyncio.run(callers()) == ["row"] * 10
+    assert len(calls) == 1
+    assert flight.stats() == {"inflight": 0, "calls": 1, "shared": 9}
+
+
+def test_different_keys_are_not_shared():
+    flight = SingleFlight()
+    fn, calls = _counted()
+
+    async def callers():
+        await asyncio.gather(flight.do("a", fn), flight.do("b", fn))
+
+    asyncio.run(callers())
+    assert len(calls) == 2
+
+
+def test_finished_call_is_not_reused():
+    flight = SingleFlight()
+    fn, calls = _counted()
+
+    async def callers():
+        await flight.do("key", fn)
+        await flight.do("key", fn)
+
+    asyncio.run(callers())
+    assert len(calls) == 2
+
+
+def test_exception_reaches_every_caller():
+    flight = SingleFlight()
+    fn, calls = _counted(error=ValueError("boom"))
+
+    async def callers():
+        return await asyncio.gather(*(flight.do("key", fn) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(callers())
+    assert len(calls) == 1
+    assert all(isinstance(result, ValueError) for result in results)
+    assert flight.stats()["inflight"] == 0
+
+
+def test_cancelled_caller_does_not_cancel_the_call():
+    flight = SingleFlight()
+    fn, _ = _counted(result="row")
+
+    async def callers():
+        first = asyncio.ensure_future(flight.do("key", fn))
+        second = asyncio.ensure_future(flight.do("key", fn))
+        await asyncio.sleep(0)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(callers()) == "row"
@@ -0,0 +1,101 @@
+import asyncio
+
+import pytest
+
+from helium.importer import IMPORT_MAX_RECORD, ImportFileError, _CSVParser, _NDJSONParser, _lines
+
+
+def _parse(parser, lines):
+    return parser.feed(lines) + parser.finish()
+
+
+def _collect_lines(chunks):
+    async def source():
+        for chunk in chunks:
+            yield chunk
+
+    async def collect():
+        return [line async for batch in _lines(source()) for line in batch]
+
+    return asyncio.run(collect())
+
+
+def test_lines_split_across_chunks():
+    assert _collect_lines([b"\xef\xbb\xbfname,em", b"ail\r\nAnn,a", b"@x.com"]) == ["name,email", "Ann,a@x.com"]
+
+
+def test_lines_reassemble_multibyte_characters():
+    assert _collect_lines(["Zoë\n".encode()[:3], "Zoë\n".encode()[3:]]) == ["Zoë"]
+
+
+def test_lines_reject_overlong_line():
+    with pytest.raises(ImportFileError):
+        _collect_lines([b"x" * (IMPORT_MAX_RECORD + 1)])
+
+
+def test_csv_rows_with_line_numbers():
+    rows = _parse(_CSVParser(), ["Name,Email", "Ann,ann@x.com", "", "Bob,bob@x.com"])
+    assert rows == [
+        (2, {"name": "Ann", "email": "ann@x.com"}),
+        (4, {"name": "Bob", "email": "bob@x.com"}),
+    ]
+
+
+def test_csv_bare_quote_in_unquoted_field():
+    parser = _CSVParser()
+    rows = parser.feed(['name,email', 'O"Brien,ob@x.com', 'Ann,ann@x.com', 'Bob,bob@x.com'])
+    assert [row for _, row in rows] == [
+        {"name": 'O"Brien', "email": "ob@x.com"},
+        {"name": "Ann", "email": "ann@x.com"},
+        {"name": "Bob", "email": "bob@x.com"},
+    ]
+    assert parser._record == []
+
+
+def test_csv_quoted_field_spanning_lines():
+    rows = _parse(_CSVParser(), ['name,email', '"Ann', 'Smith",ann@x.com', 'Bob,bob@x.com'])
+    assert rows == [
+        (2, {"name": "Ann\nSmith", "email": "ann@x.com"}),
+        (4, {"name": "Bob", "email": "bob@x.com"}),
+    ]
+
+
+def test_csv_unterminated_quote_rejects_only_its_line():
+    rows = _parse(_CSVParser(), ['name,email', '"Ann,ann@x.com', 'Bob,bob@x.com', 'Cy,cy@x.com'])
+    assert isinstance(rows[0][1], ImportFileError)
+    assert rows[0][0] == 2
+    assert rows[1:] == [
+        (3, {"name": "Bob", "email": "bob@x.com"}),
+        (4, {"name": "Cy", "email": "cy@x.com"}),
+    ]
+
+
+def test_csv_malformed_record_is_rejected():
+    rows = _parse(_CSVParser(), ['name,email', '"Ann"x,ann@x.com', 'Bob,bob@x.com'])
+    assert rows[0][0] == 2 and isinstance(rows[0][1], ImportFileError)
+    assert rows[1] == (3, {"name": "Bob", "email": "bob@x.com"})
+
+
+def test_csv_open_record_is_bounded():
+    parser = _CSVParser()
+    line = "x" * 1000
+    rows = parser.feed(['name,email', '"' + line] + [line] * (IMPORT_MAX_RECORD // 1000 + 1))
+    assert rows and isinstance(rows[0][1], ImportFileError)
+    assert parser._record_size <= IMPORT_MAX_RECORD
+
+
+def test_csv_header_needs_name_and_email():
+    with pytest.raises(ImportFileError):
+        _CSVParser().feed(["first,last", "Ann,Smith"])
+
+
+def test_csv_empty_file():
+    with pytest.raises(ImportFileError):
+        _CSVParser().finish()
+
+
+def test_ndjson_rows_and_rejects():
+    rows = _parse(_NDJSONParser(), ['{"name": "Ann", "email": "ann@x.com"}', "", "[1]", "{bad"])
+    assert rows[0] == (1, {"name": "Ann", "email": "ann@x.com"})
+    assert [line for line, _ in rows[1:]] == [3, 4]
+    assert all(isinstance(row, ImportFileError) for _, row in rows[1:])
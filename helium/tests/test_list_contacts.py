@@ -0,0 +1,107 @@
+import asyncio
+import base64
+import json
+from contextlib import asynccontextmanager
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.dialects import postgresql
+
+from helium.crud.contact import LIST_FILTER_SORTS, LIST_SORTS, _decode_cursor, _encode_cursor, _list_contacts, _prefix_bound
+
+
+def _cursor(values) -> str:
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip("=")
+
+
+def _rejected(call) -> str:
+    with pytest.raises(HTTPException) as raised:
+        call()
+    assert raised.value.status_code == 400
+    return raised.value.detail
+
+
+class _Result(list):
+    def all(self):
+        return list(self)
+
+
+class _Engine:
+    """
+    Answers every query with rows, recording the compiled SQL.
+    """
+
+    def __init__(self, rows=()):
+        self.rows = rows
+        self.queries = []
+
+    @asynccontextmanager
+    async def connect(self):
+        yield self
+
+    async def execute(self, query):
+        self.queries.append(str(query.compile(dialect=postgresql.dialect())))
+        return _Result(self.rows)
+
+
+def test_cursor_round_trip():
+    for sort, values in (("name", ["Ann", 7]), ("-email", ["ann@x.com", 7]), ("id", [7]), ("name_lower", ["ann", 7])):
+        cursor = _encode_cursor(sort, values)
+        assert "=" not in cursor
+        assert _decode_cursor(cursor, sort) == values
+
+
+def test_cursor_must_match_the_sort():
+    cursor = _encode_cursor("name", ["Ann", 7])
+    assert _rejected(lambda: _decode_cursor(cursor, "-name")) == "Cursor does not match the sort order."
+    assert _rejected(lambda: _decode_cursor(cursor, "email")) == "Cursor does not match the sort order."
+
+
+@pytest.mark.parametrize("sort,cursor", [
+    ("id", "not base64!"),
+    ("id", _cursor({"sort": "id"})),
+    ("id", _cursor(["id"])),
+    ("id", _cursor(["id", True])),
+    ("id", _cursor(["id", "7"])),
+    ("id", _cursor(["id", 7, 8])),
+    ("name", _cursor(["name", 7, "Ann"])),
+    ("name", _cursor(["name", "Ann", 7.5])),
+])
+def test_malformed_cursors_are_rejected(sort, cursor):
+    assert _rejected(lambda: _decode_cursor(cursor, sort)) == "Invalid cursor."
+
+
+def test_prefix_bound():
+    assert _prefix_bound("ab") == "ac"
+    assert _prefix_bound("a\U0010ffff") is None
+
+
+def test_every_filter_names_sorts_that_exist():
+    for sorts in LIST_FILTER_SORTS.values():
+        assert set(sorts) <= set(LIST_SORTS)
+
+
+@pytest.mark.parametrize("sort,filters", [
+    ("email", {"email_domain": "x.com"}),
+    ("name", {"name_prefix": "an"}),
+    ("-name", {"id_min": 5}),
+    ("name_lower", {"email": "ann@x.com"}),
+])
+def test_filters_without_an_index_for_the_sort_are_rejected(sort, filters):
+    engine = _Engine()
+    detail = _rejected(lambda: asyncio.run(_list_contacts(engine, sort=sort, **filters)))
+    assert detail.startswith(f"Filter {next(iter(filters))} can only be used with sort=")
+    assert engine.queries == []
+
+
+def test_unknown_sort_is_rejected():
+    assert _rejected(lambda: asyncio.run(_list_contacts(_Engine(), sort="phone"))) == "Invalid sort 'phone'."
+
+
+def test_next_cursor_holds_the_sort_keys_of_the_last_row():
+    rows = [(1, "Ann", "ann@x.com", "ann", 1), (2, "Bob", "bob@x.com", "bob", 2)]
+    engine = _Engine(rows)
+    items, cursor = asyncio.run(_list_contacts(engine, limit=1, sort="name_lower", name_prefix="A", fresh=True))
+    assert items == [{"id": 1, "name": "Ann", "email": "ann@x.com"}]
+    assert _decode_cursor(cursor, "name_lower") == ["ann", 1]
+    assert 'lower(contacts.name) COLLATE "C"' in engine.queries[0]
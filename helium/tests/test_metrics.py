@@ -0,0 +1,30 @@
+from helium.metrics import CallbackMetric, Counter, Histogram
+
+
+def test_counter_family_is_named_after_its_samples():
+    counter = Counter("helium_things", "Things.", ("kind",))
+    counter.inc("a", amount=2)
+    assert counter.render().splitlines() == [
+        "# HELP helium_things_total Things.",
+        "# TYPE helium_things_total counter",
+        'helium_things_total{kind="a"} 2',
+    ]
+
+
+def test_callback_counter_and_gauge():
+    counter = CallbackMetric("helium_hits", "Hits.", (), lambda: {(): 3}, type="counter")
+    gauge = CallbackMetric("helium_size", "Size.", (), lambda: {(): 4})
+    assert counter.render().splitlines()[1:] == ["# TYPE helium_hits_total counter", "helium_hits_total 3"]
+    assert gauge.render().splitlines()[1:] == ["# TYPE helium_size gauge", "helium_size 4"]
+
+
+def test_histogram_samples():
+    histogram = Histogram("helium_latency_seconds", "Latency.", buckets=(0.1, 1.0))
+    histogram.observe(value=0.5)
+    assert histogram.render().splitlines()[2:] == [
+        'helium_latency_seconds_bucket{le="0.1"} 0',
+        'helium_latency_seconds_bucket{le="1.0"} 1',
+        'helium_latency_seconds_bucket{le="+Inf"} 1',
+        "helium_latency_seconds_sum 0.5",
+        "helium_latency_seconds_count 1",
+    ]
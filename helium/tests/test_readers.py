@@ -0,0 +1,124 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+
+from helium.db.readers import CAUGHT_UP, Reader, ReaderSet, parse_lsn
+
+
+class _Result:
+    def __init__(self, row):
+        self.row = row
+
+    def one(self):
+        return self.row
+
+
+class _Engine:
+    """
+    Answers the replay position query with the next of positions, (in_recovery, lsn) each.
+    """
+
+    def __init__(self, positions, delay=0.0):
+        self.positions = list(positions)
+        self.delay = delay
+        self.queries = 0
+
+    def execution_options(self, **options):
+        return self
+
+    @asynccontextmanager
+    async def connect(self):
+        yield self
+
+    async def execute(self, query):
+        self.queries += 1
+        await asyncio.sleep(self.delay)
+        return _Result(self.positions.pop(0) if len(self.positions) > 1 else self.positions[0])
+
+
+def _reader(name, positions, delay=0.0):
+    return Reader(name, name, _Engine(positions, delay))
+
+
+def test_parse_lsn():
+    assert parse_lsn("0/0") == 0
+    assert parse_lsn("16/B374D848") == (0x16 << 32) | 0xB374D848
+    assert parse_lsn("1/0") > parse_lsn("0/FFFFFFFF")
+    for token in ("", "16", "/1", "1/", "123456789/0", "x/1", "1/2/3"):
+        with pytest.raises(ValueError):
+            parse_lsn(token)
+
+
+def test_reader_already_past_token_needs_no_query():
+    reader = _reader("r", [(True, "0/10")])
+    reader.replay_lsn = parse_lsn("0/20")
+    readers = ReaderSet([reader])
+    assert asyncio.run(readers.select_caught_up(parse_lsn("0/18"))) is reader
+    assert reader.engine.queries == 0
+    assert readers.token_reads["immediate"] == 1
+
+
+def test_waits_for_a_reader_to_catch_up():
+    slow = _reader("slow", [(True, "0/10")])
+    fast = _reader("fast", [(True, "0/10"), (True, "0/30")])
+    readers = ReaderSet([slow, fast])
+    assert asyncio.run(readers.select_caught_up(parse_lsn("0/20"), max_wait=1)) is fast
+    assert readers.token_reads["waited"] == 1
+
+
+def test_primary_counts_as_caught_up():
+    reader = _reader("r", [(False, None)])
+    assert asyncio.run(ReaderSet([reader]).select_caught_up(parse_lsn("5/0"))) is reader
+    assert reader.replay_lsn == CAUGHT_UP
+
+
+def test_reader_without_replay_position_is_not_polled_again():
+    reader = _reader("r", [(True, None)])
+    readers = ReaderSet([reader])
+
+    async def reads():
+        return await asyncio.gather(*(readers.select_caught_up(parse_lsn("0/1"), max_wait=1) for _ in range(20)))
+
+    assert asyncio.run(reads()) == [None] * 20
+    assert reader.engine.queries == 1
+    assert reader.serves_tokens is False
+    assert readers.token_reads["writer"] == 20
+
+    # Without a reader able to serve tokens, reads go to the writer without a query
+    assert asyncio.run(readers.select_caught_up(parse_lsn("0/1"), max_wait=1)) is None
+    assert reader.engine.queries == 1
+
+
+def test_concurrent_waiters_share_one_query_per_reader():
+    reader = _reader("r", [(True, "0/10")], delay=0.01)
+    readers = ReaderSet([reader])
+
+    async def reads():
+        return await asyncio.gather(*(readers.select_caught_up(parse_lsn("0/8")) for _ in range(50)))
+
+    assert asyncio.run(reads()) == [reader] * 50
+    assert reader.engine.queries == 1
+
+
+def test_hanging_reader_costs_at_most_the_wait():
+    reader = _reader("r", [(True, "0/10")], delay=10)
+    readers = ReaderSet([reader])
+
+    async def read():
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        selected = await readers.select_caught_up(parse_lsn("0/8"), max_wait=0.05)
+        return selected, loop.time() - start
+
+    selected, elapsed = asyncio.run(read())
+    assert selected is None
+    assert elapsed < 1
+
+
+def test_unhealthy_readers_are_skipped():
+    reader = _reader("r", [(True, "0/10")])
+    reader.healthy = False
+    readers = ReaderSet([reader])
+    assert asyncio.run(readers.select_caught_up(parse_lsn("0/1"))) is None
+    assert reader.engine.queries == 0